@@ -1,24 +1,256 @@
-from flask import Flask, request, jsonify
+from flask import Flask, Response, abort, g, request, jsonify
 from flask_cors import CORS
-import pandas as pd
-import numpy as np
+from contextlib import contextmanager
 from datetime import datetime
-import json
+from functools import wraps
 import os
-from symptom_analyzer import SymptomAnalyzer
-from questionnaire_handler import QuestionnaireHandler
-from chat_handler import ChatHandler
+import threading
+import time
+from session_store import MemorySessionStore, SQLiteSessionStore, SessionConflict
+from json_provider import FastJSONProvider
+import ml_model
+import metrics
+import profiling
+import server_timing
+import config
 
 app = Flask(__name__)
+app.json = FastJSONProvider(app)
 CORS(app)  # Enable CORS for React frontend
 
-# Initialize handlers
-symptom_analyzer = SymptomAnalyzer()
-questionnaire_handler = QuestionnaireHandler()
-chat_handler = ChatHandler()
+# Handlers are created on first use; the ML model is warmed in the background
+_handlers = {}
+_handlers_lock = threading.Lock()
+_warm_up = {'thread': None, 'ready': False, 'error': None}
+
+
+def _get_handler(name, factory):
+    """Create a handler once, on first use"""
+    handler = _handlers.get(name)
+    if handler is None:
+        with _handlers_lock:
+            handler = _handlers.get(name)
+            if handler is None:
+                handler = _handlers[name] = factory()
+    return handler
+
+
+def get_symptom_analyzer():
+    from symptom_analyzer import SymptomAnalyzer
+    return _get_handler('symptom_analyzer', SymptomAnalyzer)
+
+
+def get_questionnaire_handler():
+    from questionnaire_handler import QuestionnaireHandler
+    return _get_handler('questionnaire_handler', QuestionnaireHandler)
+
+
+def get_chat_handler():
+    from chat_handler import ChatHandler
+    return _get_handler('chat_handler', ChatHandler)
+
+
+def _warm_up_handlers():
+    """Load the ML model and build the handlers ahead of the first request"""
+    try:
+        get_chat_handler()
+        get_questionnaire_handler()
+        get_symptom_analyzer()
+        ml_model.get_model()
+        _warm_up['ready'] = True
+    except Exception as e:
+        _warm_up['error'] = str(e)
+        print(f"Warm-up failed: {e}")
+
+
+def start_warm_up():
+    """Start warming up in a daemon thread, unless already started"""
+    with _handlers_lock:
+        if _warm_up['thread'] is None:
+            _warm_up['thread'] = threading.Thread(target=_warm_up_handlers, name='warm-up', daemon=True)
+            _warm_up['thread'].start()
+
+
+def _finish_warm_up_before_fork():
+    # Forking mid-load would leave the child with locks held by a thread that
+    # no longer exists, so let the load finish; workers forked after a
+    # preload then also share the loaded model
+    thread = _warm_up['thread']
+    if thread is not None and thread is not threading.current_thread():
+        thread.join(config.FORK_WARM_UP_WAIT_SECONDS)
+
+
+def _reset_warm_up_after_fork():
+    # Threads do not survive fork (e.g. gunicorn --preload), so warm up again
+    global _handlers_lock
+    _handlers_lock = threading.Lock()
+    _warm_up['thread'] = None
+    start_warm_up()
+
 
 # Store user sessions
-user_sessions = {}
+if config.SESSION_BACKEND == 'sqlite':
+    session_store = SQLiteSessionStore(
+        config.SESSION_DB_PATH,
+        ttl_seconds=config.SESSION_TTL_SECONDS,
+        max_entries=config.SESSION_MAX_ENTRIES,
+        sweep_interval=config.SESSION_SWEEP_INTERVAL_SECONDS
+    )
+else:
+    session_store = MemorySessionStore(
+        ttl_seconds=config.SESSION_TTL_SECONDS,
+        max_entries=config.SESSION_MAX_ENTRIES,
+        max_bytes=config.SESSION_MAX_BYTES,
+        sweep_interval=config.SESSION_SWEEP_INTERVAL_SECONDS
+    )
+
+if config.WARM_UP_ON_START:
+    start_warm_up()
+    os.register_at_fork(before=_finish_warm_up_before_fork, after_in_child=_reset_warm_up_after_fork)
+
+# Retrain and swap the model in the background when the dataset changes
+model_reloader = ml_model.ModelReloader(config.MODEL_RELOAD_INTERVAL_SECONDS)
+if config.MODEL_RELOAD_INTERVAL_SECONDS > 0:
+    model_reloader.start()
+    os.register_at_fork(after_in_child=model_reloader.restart_after_fork)
+
+
+def _model_stats():
+    """Version of the loaded model and reload counters"""
+    model = ml_model.get_loaded_model()
+    return dict(
+        model_reloader.stats(),
+        version=model.version if model is not None else None,
+        artifact_key=model.artifact_key if model is not None else None
+    )
+
+
+def _cache_stats():
+    """Result cache counters of whatever has been loaded so far"""
+    caches = {}
+    model = ml_model.get_loaded_model()
+    if model is not None:
+        caches['predictions'] = dict(model.prediction_cache.stats(), model_version=model.version)
+    analyzer = _handlers.get('symptom_analyzer')
+    if analyzer is not None:
+        caches['symptoms'] = analyzer.symptom_cache.stats()
+    return caches
+
+
+# Session gauges are read from the store when /metrics is scraped
+metrics.registry.register(metrics.Gauge(
+    'mindease_sessions', 'Live sessions in the session store.',
+    lambda: session_store.stats()['live_sessions']
+))
+metrics.registry.register(metrics.Gauge(
+    'mindease_session_store_bytes', 'Approximate size of the session store in memory or on disk.',
+    lambda: session_store.stats()['approx_bytes']
+))
+
+
+# Opt-in per-request profiling
+request_profiler = profiling.from_config()
+
+
+@app.before_request
+def _start_request_timer():
+    g.request_started = time.perf_counter()
+    if request_profiler.enabled and request_profiler.wants(request.headers.get(profiling.PROFILE_HEADER)):
+        route = request.url_rule.rule if request.url_rule is not None else 'unmatched'
+        profile = request_profiler.start(request.method, route)
+        if profile is not None:
+            g.request_profile = profile
+
+
+@app.after_request
+def _record_request_metrics(response):
+    # Streamed responses are timed until their first byte is ready
+    started = g.pop('request_started', None)
+    if config.METRICS_ENABLED and started is not None:
+        route = request.url_rule.rule if request.url_rule is not None else 'unmatched'
+        metrics.REQUEST_SECONDS.observe(
+            time.perf_counter() - started, request.method, route, str(response.status_code)
+        )
+    return response
+
+
+@app.after_request
+def _finish_request_profile(response):
+    profile = g.pop('request_profile', None)
+    if profile is not None:
+        profile_id = request_profiler.finish(profile)
+        # Only clients that asked for a profile learn where it went
+        if profile_id and profiling.PROFILE_HEADER in request.headers:
+            response.headers['X-MindEase-Profile-Id'] = profile_id
+    return response
+
+
+@app.teardown_request
+def _stop_abandoned_profile(exc):
+    # A profile left running would keep profiling this worker thread
+    profile = g.pop('request_profile', None)
+    if profile is not None:
+        profile.stop()
+
+
+@app.route('/metrics', methods=['GET'])
+def prometheus_metrics():
+    """Prometheus metrics for this process"""
+    if not config.METRICS_ENABLED:
+        abort(404)
+    return Response(metrics.registry.expose(), content_type=metrics.CONTENT_TYPE)
+
+
+def with_server_timing(view):
+    """Send the stage durations recorded while the view runs in a Server-Timing header"""
+    if not config.SERVER_TIMING_ENABLED:
+        return view
+    
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        started = time.perf_counter()
+        timing, token = server_timing.begin()
+        try:
+            response = app.make_response(view(*args, **kwargs))
+        finally:
+            server_timing.end(token)
+        response.headers['Server-Timing'] = timing.header(total=time.perf_counter() - started)
+        return response
+    return wrapper
+
+
+def retry_session_conflicts(view):
+    """Run the view again when another worker process saved its session first
+    
+    Session updates are computed without holding the database lock, so a
+    view that loses the race re-reads the session and redoes its work.
+    """
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        for _ in range(config.SESSION_CONFLICT_RETRIES + 1):
+            try:
+                return view(*args, **kwargs)
+            except SessionConflict:
+                continue
+        return jsonify({'error': 'Session is busy, please retry'}), 409
+    return wrapper
+
+
+@contextmanager
+def _session_transaction(session_id, write=True):
+    """session_store.transaction, with the lock wait, load and save timed as 'session'"""
+    started = time.perf_counter()
+    with session_store.transaction(session_id, write) as session:
+        server_timing.add('session', time.perf_counter() - started)
+        yield session
+        started = time.perf_counter()
+    server_timing.add('session', time.perf_counter() - started)
+
+
+def _jsonify_timed(payload):
+    """jsonify, timed as 'serialize'"""
+    with server_timing.stage('serialize'):
+        return jsonify(payload)
 
 
 @app.route('/health', methods=['GET'])
@@ -27,10 +259,28 @@ def health_check():
     return jsonify({
         'status': 'healthy',
         'message': 'Mental Health Assessment API is running',
-        'timestamp': datetime.now().isoformat()
+        'timestamp': datetime.now().isoformat(),
+        'sessions': session_store.stats(),
+        'model': _model_stats(),
+        'caches': _cache_stats(),
+        'profiling': request_profiler.stats()
     }), 200
 
 
+@app.route('/ready', methods=['GET'])
+def readiness_check():
+    """Readiness endpoint: 200 once the ML model and handlers are loaded"""
+    if _warm_up['ready']:
+        return jsonify({'status': 'ready'}), 200
+    
+    if _warm_up['error']:
+        return jsonify({'status': 'failed', 'error': _warm_up['error']}), 503
+    
+    if _warm_up['thread'] is None:
+        start_warm_up()
+    return jsonify({'status': 'warming_up'}), 503
+
+
 @app.route('/api/start-session', methods=['POST'])
 def start_session():
     """Start a new assessment session"""
@@ -38,24 +288,27 @@ def start_session():
     session_id = data.get('session_id', datetime.now().strftime('%Y%m%d%H%M%S%f'))
     assessment_type = data.get('type', 'questionnaire')  # 'questionnaire' or 'chat'
     
-    user_sessions[session_id] = {
+    session_store.create(session_id, {
         'type': assessment_type,
         'started_at': datetime.now().isoformat(),
         'responses': [],
+        'answers': {},
         'current_question': 0,
         'symptoms_detected': [],
-        'chat_history': []
-    }
+        'chat_history': [],
+        'conversation': get_chat_handler().new_conversation_state(),
+        'chat_terms': None
+    })
     
     if assessment_type == 'questionnaire':
-        first_question = questionnaire_handler.get_first_question()
+        first_question = get_questionnaire_handler().get_first_question()
         return jsonify({
             'session_id': session_id,
             'type': 'questionnaire',
             'question': first_question
         }), 200
     else:
-        welcome_message = chat_handler.get_welcome_message()
+        welcome_message = get_chat_handler().get_welcome_message()
         return jsonify({
             'session_id': session_id,
             'type': 'chat',
@@ -64,136 +317,238 @@ def start_session():
 
 
 @app.route('/api/questionnaire/answer', methods=['POST'])
+@retry_session_conflicts
 def submit_answer():
     """Submit answer to questionnaire"""
     data = request.json
     session_id = data.get('session_id')
     answer = data.get('answer')
     
-    if session_id not in user_sessions:
-        return jsonify({'error': 'Invalid session'}), 400
-    
-    session = user_sessions[session_id]
-    
-    # Store the answer
-    session['responses'].append({
-        'question_index': session['current_question'],
-        'answer': answer,
-        'timestamp': datetime.now().isoformat()
-    })
+    questionnaire_handler = get_questionnaire_handler()
+    with session_store.transaction(session_id) as session:
+        if session is None:
+            return jsonify({'error': 'Invalid session'}), 400
+        
+        # current_question is the index of the question being answered
+        question_index = session['current_question']
+        if question_index < questionnaire_handler.total_questions:
+            # Store the answer
+            session['responses'].append({
+                'question_index': question_index,
+                'answer': answer,
+                'timestamp': datetime.now().isoformat()
+            })
+            answers = session.setdefault('answers', {})
+            questionnaire_handler.record_answer(answers, question_index, answer)
+            
+            # Move to the next question that is not skipped
+            session['current_question'] = questionnaire_handler.next_question_index(question_index, answers)
+        current_question = session['current_question']
+        responses = list(session['responses'])
     
     # Get next question or results
-    next_question = questionnaire_handler.get_next_question(
-        session['current_question'], 
-        session['responses']
-    )
-    
-    session['current_question'] += 1
-    
-    if next_question is None:
+    if current_question >= questionnaire_handler.total_questions:
         # Assessment complete
-        results = symptom_analyzer.analyze_questionnaire(session['responses'])
+        results = get_symptom_analyzer().analyze_questionnaire(responses)
         return jsonify({
             'completed': True,
             'results': results
         }), 200
     else:
-        return jsonify({
-            'completed': False,
-            'question': next_question,
-            'progress': questionnaire_handler.get_progress(session['current_question'])
-        }), 200
+        # The body for each question is rendered once when the bank loads
+        return Response(questionnaire_handler.answer_body(current_question), mimetype='application/json')
 
 
 @app.route('/api/chat/message', methods=['POST'])
+@with_server_timing
+@retry_session_conflicts
 def chat_message():
     """Handle chat message from user"""
     data = request.json
     session_id = data.get('session_id')
     message = data.get('message')
     
-    if session_id not in user_sessions:
-        return jsonify({'error': 'Invalid session'}), 400
-    
-    session = user_sessions[session_id]
-    
-    # Add user message to history
-    session['chat_history'].append({
-        'role': 'user',
-        'message': message,
-        'timestamp': datetime.now().isoformat()
-    })
-    
-    # Process the message and extract symptoms
-    response, symptoms_found = chat_handler.process_message(
-        message, 
-        session['chat_history']
-    )
-    
-    # Update detected symptoms
-    session['symptoms_detected'].extend(symptoms_found)
-    
-    # Add bot response to history
-    session['chat_history'].append({
-        'role': 'bot',
-        'message': response,
-        'timestamp': datetime.now().isoformat()
-    })
+    with _session_transaction(session_id) as session:
+        if session is None:
+            return jsonify({'error': 'Invalid session'}), 400
+        
+        # Add user message to history
+        session['chat_history'].append({
+            'role': 'user',
+            'message': message,
+            'timestamp': datetime.now().isoformat()
+        })
+        
+        # Process the message and extract symptoms
+        response, symptoms_found = get_chat_handler().process_message(
+            message, 
+            session['chat_history'],
+            session['conversation']
+        )
+        
+        # Update detected symptoms and the running term counts for analysis
+        session['symptoms_detected'].extend(symptoms_found)
+        session['chat_terms'] = get_symptom_analyzer().update_chat_terms(
+            session.get('chat_terms'),
+            message,
+            session['chat_history']
+        )
+        
+        # Add bot response to history
+        session['chat_history'].append({
+            'role': 'bot',
+            'message': response,
+            'timestamp': datetime.now().isoformat()
+        })
+        symptoms_detected = list(session['conversation']['symptom_counts'])
     
-    return jsonify({
+    return _jsonify_timed({
         'response': response,
-        'symptoms_detected': list(set(session['symptoms_detected']))
+        'symptoms_detected': symptoms_detected
     }), 200
 
 
 @app.route('/api/chat/analyze', methods=['POST'])
+@with_server_timing
 def analyze_chat():
     """Analyze chat conversation and provide assessment"""
     data = request.json
     session_id = data.get('session_id')
     
-    if session_id not in user_sessions:
-        return jsonify({'error': 'Invalid session'}), 400
+    # Take a consistent snapshot, then analyze without holding the lock
+    with _session_transaction(session_id, write=False) as session:
+        if session is None:
+            return jsonify({'error': 'Invalid session'}), 400
+        symptoms_detected = list(session['symptoms_detected'])
+        chat_history = list(session['chat_history'])
+        chat_terms = session.get('chat_terms')
+        if chat_terms is not None:
+            chat_terms = dict(chat_terms, counts=dict(chat_terms['counts']))
     
-    session = user_sessions[session_id]
+    stream_format = request.accept_mimetypes.best_match(
+        ['application/json', 'text/event-stream', 'application/x-ndjson']
+    )
+    if stream_format in STREAM_FORMATS:
+        return _stream_chat_analysis(stream_format, symptoms_detected, chat_history, chat_terms)
     
     # Analyze all collected symptoms
-    results = symptom_analyzer.analyze_chat_symptoms(
-        session['symptoms_detected'],
-        session['chat_history']
+    results = get_symptom_analyzer().analyze_chat_symptoms(
+        symptoms_detected,
+        chat_history,
+        chat_terms
     )
     
-    return jsonify({
+    return _jsonify_timed({
         'results': results
     }), 200
 
 
+def _sse_event(stage, payload):
+    return f"event: {stage}\ndata: {app.json.dumps(payload)}\n\n"
+
+
+def _ndjson_event(stage, payload):
+    return app.json.dumps({'event': stage, 'data': payload}) + '\n'
+
+
+# Streaming formats of /api/chat/analyze, chosen with the Accept header
+STREAM_FORMATS = {
+    'text/event-stream': _sse_event,
+    'application/x-ndjson': _ndjson_event
+}
+
+
+def _stream_chat_analysis(stream_format, symptoms_detected, chat_history, chat_terms):
+    """Stream the chat analysis stage by stage
+    
+    Events, in order: 'crisis' and 'keywords' (no ML needed), 'predictions',
+    'recommendations' and finally 'done' with the assessment date, or
+    'error' if a later stage fails after the response has started. Headers
+    go out before the analysis runs, so Server-Timing only covers the
+    session snapshot.
+    """
+    format_event = STREAM_FORMATS[stream_format]
+    
+    def generate():
+        crisis = get_chat_handler().crisis_response(symptoms_detected)
+        yield format_event('crisis', {
+            'crisis': crisis is not None,
+            'crisis_resources': crisis['crisis_resources'] if crisis else []
+        })
+        try:
+            for stage, payload in get_symptom_analyzer().iter_chat_analysis(
+                symptoms_detected, chat_history, chat_terms
+            ):
+                yield format_event(stage, payload)
+        except Exception as e:
+            print(f"Chat analysis stream failed: {e}")
+            yield format_event('error', {'error': 'Analysis failed'})
+            return
+        yield format_event('done', {'assessment_date': datetime.now().isoformat(), 'ml_powered': True})
+    
+    return Response(generate(), mimetype=stream_format, headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'  # keep reverse proxies from buffering the stream
+    })
+
+
 @app.route('/api/symptoms/search', methods=['POST'])
+@with_server_timing
 def search_symptoms():
     """Search for symptoms in text"""
     data = request.json
     text = data.get('text', '')
     
+    symptom_analyzer = get_symptom_analyzer()
     symptoms = symptom_analyzer.extract_symptoms(text)
     possible_conditions = symptom_analyzer.get_possible_conditions(symptoms)
     
-    return jsonify({
+    return _jsonify_timed({
         'symptoms_found': symptoms,
         'possible_conditions': possible_conditions
     }), 200
 
 
+@app.route('/api/symptoms/search/batch', methods=['POST'])
+def search_symptoms_batch():
+    """Search for symptoms in many texts with one batched model call
+    
+    Unlike /api/symptoms/search, each result also has the model's ml_predictions.
+    """
+    data = request.json
+    texts = data.get('texts')
+    
+    if not isinstance(texts, list) or not all(isinstance(text, str) for text in texts):
+        return jsonify({'error': "'texts' must be a list of strings"}), 400
+    if len(texts) > config.SEARCH_BATCH_MAX_TEXTS:
+        return jsonify({'error': f'At most {config.SEARCH_BATCH_MAX_TEXTS} texts per batch'}), 400
+    
+    symptom_analyzer = get_symptom_analyzer()
+    ml_predictions = symptom_analyzer.ml_model.predict_conditions_batch(texts)
+    
+    results = []
+    for text, predictions in zip(texts, ml_predictions):
+        symptoms = symptom_analyzer.extract_symptoms(text)
+        results.append({
+            'symptoms_found': symptoms,
+            'possible_conditions': symptom_analyzer.get_possible_conditions(symptoms),
+            'ml_predictions': predictions
+        })
+    
+    return jsonify({'results': results}), 200
+
+
 @app.route('/api/conditions', methods=['GET'])
 def get_conditions():
     """Get all mental health conditions"""
-    conditions = symptom_analyzer.get_all_conditions()
+    conditions = get_symptom_analyzer().get_all_conditions()
     return jsonify({'conditions': conditions}), 200
 
 
 @app.route('/api/condition/<condition_name>', methods=['GET'])
 def get_condition_details(condition_name):
     """Get details about a specific condition"""
-    details = symptom_analyzer.get_condition_details(condition_name)
+    details = get_symptom_analyzer().get_condition_details(condition_name)
     if details:
         return jsonify(details), 200
     else:
@@ -203,17 +558,17 @@ def get_condition_details(condition_name):
 @app.route('/api/session/<session_id>', methods=['GET'])
 def get_session(session_id):
     """Get session information"""
-    if session_id in user_sessions:
-        return jsonify(user_sessions[session_id]), 200
-    else:
-        return jsonify({'error': 'Session not found'}), 404
+    with session_store.transaction(session_id, write=False) as session:
+        if session is not None:
+            return jsonify(session), 200
+        else:
+            return jsonify({'error': 'Session not found'}), 404
 
 
 @app.route('/api/session/<session_id>', methods=['DELETE'])
 def delete_session(session_id):
     """Delete a session"""
-    if session_id in user_sessions:
-        del user_sessions[session_id]
+    if session_store.delete(session_id):
         return jsonify({'message': 'Session deleted'}), 200
     else:
         return jsonify({'error': 'Session not found'}), 404
@@ -225,13 +580,19 @@ if __name__ == '__main__':
     print("=" * 50)
     print("Server starting on http://localhost:5000")
     print("\nAvailable Endpoints:")
+    print("  GET  /ready - Readiness (model loaded)")
+    print("  GET  /metrics - Prometheus metrics")
     print("  POST /api/start-session - Start new assessment")
     print("  POST /api/questionnaire/answer - Submit questionnaire answer")
     print("  POST /api/chat/message - Send chat message")
     print("  POST /api/chat/analyze - Get chat analysis")
     print("  POST /api/symptoms/search - Search symptoms in text")
+    print("  POST /api/symptoms/search/batch - Search symptoms in many texts")
     print("  GET  /api/conditions - Get all conditions")
     print("  GET  /api/condition/<name> - Get condition details")
     print("=" * 50)
     
+    if config.SESSION_BACKGROUND_SWEEP:
+        session_store.start_sweeper()
+    
     app.run(debug=True, host='0.0.0.0', port=5000)
@@ -0,0 +1,63 @@
+"""
+Benchmark: chat analysis from the running term state vs. the full transcript
+
+Builds conversations of increasing length and compares analyzing the joined
+transcript (the previous strategy) against scoring the per-session term
+state that /api/chat/message keeps up to date.
+
+Run from the backend directory:
+    python benchmarks/bench_chat_analyze.py [--lengths 10 100 1000] [--repeat N]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ml_model import MentalHealthModel  # noqa: E402
+
+PHRASES = [
+    "I've been feeling really down lately",
+    "I can't sleep and I keep waking up at night",
+    "my heart is racing and I worry about everything",
+    "I have no energy and I feel hopeless",
+    "work has me completely overwhelmed",
+    "I keep having nightmares and flashbacks",
+    "I don't enjoy anything anymore",
+    "I get nervous around people and avoid them"
+]
+
+
+def time_call(function, repeat):
+    started = time.perf_counter()
+    for _ in range(repeat):
+        function()
+    return (time.perf_counter() - started) / repeat * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--lengths', type=int, nargs='+', default=[10, 100, 1000])
+    parser.add_argument('--repeat', type=int, default=50)
+    parser.add_argument('--seed', type=int, default=7)
+    args = parser.parse_args()
+
+    model = MentalHealthModel()
+    print(f"{'messages':>8} {'transcript us':>14} {'term state us':>14} {'speedup':>8}")
+    for length in args.lengths:
+        rng = random.Random(args.seed)
+        messages = [rng.choice(PHRASES) for _ in range(length)]
+        term_state = model.new_term_state()
+        for message in messages:
+            model.add_to_term_state(term_state, message)
+
+        # Bypass the prediction cache so every call does the full work
+        transcript = time_call(lambda: model._predict_conditions(' '.join(messages), 5), args.repeat)
+        incremental = time_call(lambda: model.predict_from_term_state(term_state), args.repeat)
+        print(f"{length:>8} {transcript:>14.1f} {incremental:>14.1f} {transcript / incremental:>7.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,125 @@
+"""
+Micro-benchmark: single-pass symptom scanner vs. the per-pattern regex loop
+
+Run from the backend directory:
+    python benchmarks/bench_detect_symptoms.py [--iterations N]
+"""
+import argparse
+import os
+import random
+import re
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from chat_handler import ChatHandler  # noqa: E402
+
+
+# Uncompiled patterns exactly as ChatHandler used them before the scanner
+LEGACY_PATTERNS = {
+    'sadness': [
+        r'\b(sad|depressed|down|unhappy|miserable|hopeless|empty|low mood)\b',
+        r'\b(feeling low|feeling blue|no joy|lost interest)\b',
+        r'\b(crying|tears|grief)\b'
+    ],
+    'anxiety': [
+        r'\b(anxious|worried|nervous|tense|stressed|panic|fear)\b',
+        r'\b(can\'t relax|on edge|restless|uneasy)\b',
+        r'\b(worry|worrying|overthinking)\b'
+    ],
+    'sleep': [
+        r'\b(can\'t sleep|insomnia|trouble sleeping|sleep problems|sleepless)\b',
+        r'\b(sleeping too much|oversleeping|tired all day)\b',
+        r'\b(nightmares|bad dreams|wake up)\b'
+    ],
+    'energy': [
+        r'\b(tired|fatigue|exhausted|no energy|drained|weak)\b',
+        r'\b(can\'t get out of bed|too tired|lethargic)\b'
+    ],
+    'concentration': [
+        r'\b(can\'t focus|can\'t concentrate|distracted|unfocused)\b',
+        r'\b(trouble thinking|mind racing|foggy|confused)\b',
+        r'\b(forgetful|memory)\b'
+    ],
+    'social': [
+        r'\b(avoid people|avoiding|don\'t want to see anyone|isolated)\b',
+        r'\b(alone|lonely|withdrawn)\b',
+        r'\b(scared of people|judgment|embarrassed)\b'
+    ],
+    'panic': [
+        r'\b(panic|heart racing|palpitations)\b',
+        r'\b(can\'t breathe|shortness of breath|chest)\b',
+        r'\b(sudden fear|intense fear)\b'
+    ],
+    'appetite': [
+        r'\b(no appetite|not eating|lost weight|overeating)\b',
+        r'\b(eating too much|weight gain|binge)\b'
+    ],
+    'mood_swings': [
+        r'\b(mood swings|ups and downs|irritable|angry)\b',
+        r'\b(emotional|crying easily|outbursts)\b'
+    ],
+    'worthlessness': [
+        r'\b(worthless|useless|failure|burden|guilty)\b',
+        r'\b(hate myself|self-blame|shame)\b'
+    ],
+    'suicidal': [
+        r'\b(suicide|suicidal|kill myself|end my life|want to die)\b',
+        r'\b(better off dead|no point living)\b'
+    ]
+}
+
+SAMPLE_MESSAGES = [
+    "I've been feeling really sad and hopeless for the past few weeks",
+    "I can't sleep at night and I'm always tired during the day",
+    "I don't want to see anyone or do anything anymore",
+    "Sometimes my heart racing makes me think I can't breathe",
+    "Work is fine, I just wanted to talk about my weekend plans with friends",
+    "I feel worthless, like a burden to everyone, and I'm too tired all day to care",
+]
+
+
+def legacy_detect(text):
+    """The original loop: one re.search per pattern until a category matches"""
+    text_lower = text.lower()
+    detected = []
+    for symptom_category, patterns in LEGACY_PATTERNS.items():
+        for pattern in patterns:
+            if re.search(pattern, text_lower):
+                detected.append(symptom_category)
+                break
+    return detected
+
+
+def build_corpus(size, seed=42):
+    """Mix sample messages into longer synthetic turns"""
+    rng = random.Random(seed)
+    return [' '.join(rng.sample(SAMPLE_MESSAGES, rng.randint(1, 3))) for _ in range(size)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--iterations', type=int, default=200)
+    parser.add_argument('--messages', type=int, default=100)
+    args = parser.parse_args()
+
+    handler = ChatHandler()
+    corpus = build_corpus(args.messages)
+
+    for text in corpus:
+        if set(legacy_detect(text)) != set(handler._detect_symptoms(text)):
+            raise SystemExit(f"Mismatch on: {text!r}")
+
+    legacy = timeit.timeit(lambda: [legacy_detect(t) for t in corpus], number=args.iterations)
+    scanner = timeit.timeit(lambda: [handler._detect_symptoms(t) for t in corpus], number=args.iterations)
+    calls = args.iterations * len(corpus)
+
+    print(f"messages per run: {len(corpus)}, runs: {args.iterations}")
+    print(f"legacy loop:     {legacy / calls * 1e6:8.2f} us/message")
+    print(f"single scanner:  {scanner / calls * 1e6:8.2f} us/message")
+    print(f"speedup:         {legacy / scanner:8.2f}x")
+
+
+if __name__ == '__main__':
+    main()
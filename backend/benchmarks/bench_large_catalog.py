@@ -0,0 +1,70 @@
+"""
+Benchmark: inverted-index candidate retrieval vs. a full similarity scan
+
+Builds synthetic catalogs of fine-grained condition/symptom profiles of
+increasing size and compares predict_conditions (posting-list scoring with
+partial top-k) against scoring every condition and fully sorting.
+
+Run from the backend directory:
+    python benchmarks/bench_large_catalog.py [--sizes 1000 10000 40000] [--queries N]
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ml_model import MentalHealthModel  # noqa: E402
+from synthetic import write_catalog  # noqa: E402
+
+
+class LargeCatalogModel(MentalHealthModel):
+    """Same model without the 5000-term vocabulary cap, as large catalogs need"""
+    VECTORIZER_PARAMS = dict(MentalHealthModel.VECTORIZER_PARAMS, max_features=None)
+
+
+def full_scan(model, text, top_k=5):
+    """The previous strategy: score every condition, then sort all scores"""
+    from sklearn.metrics.pairwise import cosine_similarity
+
+    user_vector = model.vectorizer.transform([model._preprocess_text(text)])
+    similarities = cosine_similarity(user_vector, model.condition_vectors).flatten()
+    return similarities.argsort()[-top_k:][::-1]
+
+
+def time_per_query(function, queries):
+    started = time.perf_counter()
+    for query in queries:
+        function(query)
+    return (time.perf_counter() - started) / len(queries) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 40000])
+    parser.add_argument('--queries', type=int, default=300)
+    parser.add_argument('--seed', type=int, default=7)
+    args = parser.parse_args()
+
+    print(f"{'conditions':>10} {'full scan us':>14} {'index us':>10} {'speedup':>8}")
+    with tempfile.TemporaryDirectory() as workdir:
+        for size in args.sizes:
+            rng = random.Random(args.seed)
+            data_path = os.path.join(workdir, f'catalog-{size}.csv')
+            vocabulary = write_catalog(data_path, size, rng)
+            model = LargeCatalogModel(data_path=data_path, artifact_dir=workdir, use_artifact=False)
+            queries = [
+                'i have been feeling ' + ' '.join(rng.choice(vocabulary) for _ in range(rng.randint(3, 8)))
+                for _ in range(args.queries)
+            ]
+
+            full = time_per_query(lambda q: full_scan(model, q), queries)
+            indexed = time_per_query(lambda q: model.predict_conditions(q), queries)
+            print(f"{size:>10} {full:>14.1f} {indexed:>10.1f} {full / indexed:>7.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,66 @@
+"""
+Benchmark: next-question resolution on large question banks
+
+Builds synthetic banks made of screening questions, each followed by a
+branch of follow-up questions that depend on it, and times
+QuestionBank.next_index when the screening question is answered "No"
+(the whole branch is skipped) and "Yes" (the branch is entered).
+
+Run from the backend directory:
+    python benchmarks/bench_questionnaire.py [--sizes 100 1000 10000] [--depth 50]
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from question_bank import QuestionBank  # noqa: E402
+
+
+def build_bank(size, depth):
+    """Screening questions, each followed by `depth` questions depending on it"""
+    questions = []
+    while len(questions) < size:
+        root = len(questions)
+        questions.append({'id': root, 'question': f'Screening {root}', 'type': 'yes_no'})
+        for level in range(min(depth, size - len(questions))):
+            questions.append({
+                'id': len(questions),
+                'question': f'Follow-up {level} of {root}',
+                'type': 'yes_no',
+                'depends_on': root
+            })
+    return QuestionBank(questions)
+
+
+def time_per_call(bank, answer, repeat):
+    roots = [index for index, parent in enumerate(bank.parents) if parent < 0]
+    answers = {str(root): answer for root in roots}
+    started = time.perf_counter()
+    for _ in range(repeat):
+        for root in roots:
+            bank.next_index(root, answers)
+    return (time.perf_counter() - started) / (repeat * len(roots)) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[100, 1000, 10000])
+    parser.add_argument('--depth', type=int, default=50)
+    parser.add_argument('--repeat', type=int, default=200)
+    args = parser.parse_args()
+
+    print(f"{'questions':>9} {'build ms':>9} {'skip branch us':>15} {'enter branch us':>16}")
+    for size in args.sizes:
+        started = time.perf_counter()
+        bank = build_bank(size, args.depth)
+        build = (time.perf_counter() - started) * 1e3
+        skip = time_per_call(bank, 'No', args.repeat)
+        enter = time_per_call(bank, 'Yes', args.repeat)
+        print(f"{size:>9} {build:>9.1f} {skip:>15.2f} {enter:>16.2f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,102 @@
+"""
+Benchmark: JSON response serialization per endpoint, stdlib vs. orjson
+
+Builds realistic payloads through the API (a long chat session, its
+analysis, a completed questionnaire and a batch symptom search) and times
+building the JSON response for each with Flask's default provider and
+with the app's FastJSONProvider. GET /api/session is also timed end to end.
+
+Run from the backend directory:
+    python benchmarks/bench_serialization.py [--turns 200] [--repeat N]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+os.environ.setdefault('MINDEASE_WARM_UP_ON_START', '0')
+os.environ.setdefault('MINDEASE_MODEL_RELOAD_INTERVAL_SECONDS', '0')
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask.json.provider import DefaultJSONProvider  # noqa: E402
+
+import app as app_module  # noqa: E402
+from json_provider import FastJSONProvider  # noqa: E402
+
+MESSAGES = [
+    "I've been feeling really down and hopeless lately",
+    "I can't sleep at night and I'm exhausted all day",
+    "my heart races and I worry about everything at work",
+    "I don't enjoy seeing my friends anymore",
+    "sometimes I feel overwhelmed and can't concentrate",
+    "I keep having nightmares about what happened"
+]
+
+
+def build_payloads(client, turns, rng):
+    """Drive the API to produce realistic response payloads"""
+    session_id = client.post('/api/start-session', json={'type': 'chat'}).get_json()['session_id']
+    for _ in range(turns):
+        client.post('/api/chat/message', json={'session_id': session_id, 'message': rng.choice(MESSAGES)})
+
+    questionnaire_id = client.post('/api/start-session', json={'type': 'questionnaire'}).get_json()['session_id']
+    while True:
+        answer = client.post('/api/questionnaire/answer', json={
+            'session_id': questionnaire_id, 'answer': rng.choice(['Yes', 'No', 'Often', 'Poor'])
+        }).get_json()
+        if answer['completed']:
+            break
+
+    return session_id, {
+        f'GET /api/session ({turns} turns)': client.get(f'/api/session/{session_id}').get_json(),
+        'POST /api/chat/analyze': client.post('/api/chat/analyze', json={'session_id': session_id}).get_json(),
+        'POST /api/questionnaire/answer (completed)': answer,
+        'POST /api/symptoms/search/batch (100 texts)': client.post('/api/symptoms/search/batch', json={
+            'texts': [rng.choice(MESSAGES) for _ in range(100)]
+        }).get_json()
+    }
+
+
+def time_per_call(function, repeat):
+    started = time.perf_counter()
+    for _ in range(repeat):
+        function()
+    return (time.perf_counter() - started) / repeat * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--turns', type=int, default=200)
+    parser.add_argument('--repeat', type=int, default=500)
+    parser.add_argument('--seed', type=int, default=7)
+    args = parser.parse_args()
+
+    app = app_module.app
+    client = app.test_client()
+    session_id, payloads = build_payloads(client, args.turns, random.Random(args.seed))
+
+    stdlib = DefaultJSONProvider(app)
+    fast = FastJSONProvider(app)
+    if not fast.enabled:
+        print("orjson is not installed; FastJSONProvider falls back to the stdlib encoder")
+
+    print(f"{'payload':<46} {'KB':>7} {'stdlib us':>10} {'fast us':>9} {'speedup':>8}")
+    with app.app_context():
+        for name, payload in payloads.items():
+            size = len(stdlib.response(payload).get_data()) / 1024
+            slow = time_per_call(lambda: stdlib.response(payload), args.repeat)
+            quick = time_per_call(lambda: fast.response(payload), args.repeat)
+            print(f"{name:<46} {size:>7.1f} {slow:>10.1f} {quick:>9.1f} {slow / quick:>7.1f}x")
+
+    url = f'/api/session/{session_id}'
+    timings = {}
+    for label, provider in (('stdlib', stdlib), ('fast', fast)):
+        app.json = provider
+        timings[label] = time_per_call(lambda: client.get(url), args.repeat // 5 or 1)
+    print(f"\nGET /api/session end to end: stdlib {timings['stdlib']:.1f}us, fast {timings['fast']:.1f}us "
+          f"({timings['stdlib'] / timings['fast']:.1f}x)")
+
+
+if __name__ == '__main__':
+    main()
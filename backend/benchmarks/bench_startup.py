@@ -0,0 +1,85 @@
+"""
+Startup benchmark: import time of the API module and time until /ready
+
+Each run happens in a fresh interpreter so module caches do not hide
+regressions. Exits non-zero when a threshold is exceeded.
+
+Run from the backend directory:
+    python benchmarks/bench_startup.py [--runs N] [--max-import-ms MS] [--max-ready-ms MS]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+HEAVY_MODULES = ('pandas', 'numpy', 'scipy', 'sklearn')
+
+# Executed in the child interpreter; prints one JSON line
+PROBE = r"""
+import json, sys, time
+started = time.perf_counter()
+import app
+imported = time.perf_counter()
+heavy_at_import = [m for m in %(heavy)r if m in sys.modules]
+
+client = app.app.test_client()
+while client.get('/ready').status_code != 200:
+    if app._warm_up['error']:
+        raise SystemExit(app._warm_up['error'])
+    time.sleep(0.005)
+ready = time.perf_counter()
+
+session_id = client.post('/api/start-session', json={'type': 'chat'}).get_json()['session_id']
+first = time.perf_counter()
+client.post('/api/chat/message', json={'session_id': session_id, 'message': 'I feel anxious'})
+client.post('/api/chat/analyze', json={'session_id': session_id})
+first_done = time.perf_counter()
+
+print(json.dumps({
+    'import_ms': (imported - started) * 1000,
+    'ready_ms': (ready - started) * 1000,
+    'first_analysis_ms': (first_done - first) * 1000,
+    'heavy_modules_at_import': heavy_at_import
+}))
+"""
+
+
+def run_once():
+    output = subprocess.run(
+        [sys.executable, '-c', PROBE % {'heavy': HEAVY_MODULES}],
+        cwd=BACKEND_DIR, capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--max-import-ms', type=float, default=None)
+    parser.add_argument('--max-ready-ms', type=float, default=None)
+    args = parser.parse_args()
+
+    runs = [run_once() for _ in range(args.runs)]
+    summary = {
+        name: round(statistics.median(run[name] for run in runs), 2)
+        for name in ('import_ms', 'ready_ms', 'first_analysis_ms')
+    }
+    summary['heavy_modules_at_import'] = sorted({m for run in runs for m in run['heavy_modules_at_import']})
+    print(json.dumps(summary, indent=2))
+
+    failures = []
+    if args.max_import_ms is not None and summary['import_ms'] > args.max_import_ms:
+        failures.append(f"import took {summary['import_ms']}ms > {args.max_import_ms}ms")
+    if args.max_ready_ms is not None and summary['ready_ms'] > args.max_ready_ms:
+        failures.append(f"ready took {summary['ready_ms']}ms > {args.max_ready_ms}ms")
+    for failure in failures:
+        print(f"REGRESSION: {failure}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,89 @@
+"""
+Fork regression check: a worker forked from the API process must become ready
+
+Covers the two ways a fork can leave a child waiting on a lock that no
+thread will release:
+
+    warm-up   fork right after import while the warm-up thread loads the
+              model (gunicorn --preload)
+    locks     with no warm-up at import, fork while another thread holds
+              the model, question bank and scorer loader locks
+
+Each case runs in a fresh interpreter; the forked child must answer /ready
+with 200 and score a questionnaire within the timeout. Exits non-zero on
+failure.
+
+Run from the backend directory:
+    python benchmarks/check_fork.py [--timeout SECONDS]
+"""
+import argparse
+import os
+import subprocess
+import sys
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Executed in the child interpreter; %(case)s selects the scenario
+PROBE = r"""
+import os, sys, threading, time
+import app, ml_model, question_bank, questionnaire_scoring
+
+if %(case)r == 'locks':
+    held = threading.Event()
+    def hold():
+        with ml_model._model_lock, question_bank._bank_lock, questionnaire_scoring._scorer_lock:
+            held.set()
+            time.sleep(%(timeout)r * 2)
+    threading.Thread(target=hold, daemon=True).start()
+    held.wait()
+
+pid = os.fork()
+if pid == 0:
+    client = app.app.test_client()
+    deadline = time.monotonic() + %(timeout)r
+    while client.get('/ready').status_code != 200:
+        if time.monotonic() > deadline:
+            os._exit(1)
+        time.sleep(0.01)
+    # Loads the shared bank and scorer behind their locks
+    app.get_symptom_analyzer().analyze_questionnaire([{'question_index': 0, 'answer': 'Often'}])
+    os._exit(0)
+
+for _ in range(int(%(timeout)r * 100) * 2):
+    done, status = os.waitpid(pid, os.WNOHANG)
+    if done:
+        break
+    time.sleep(0.01)
+else:
+    os.kill(pid, 9)
+    status = 1
+print('ok' if os.WIFEXITED(status) and os.WEXITSTATUS(status) == 0 else 'stuck')
+"""
+
+
+def run_case(case, timeout):
+    env = dict(os.environ, MINDEASE_WARM_UP_ON_START='1' if case == 'warm-up' else '0',
+               MINDEASE_MODEL_RELOAD_INTERVAL_SECONDS='0')
+    result = subprocess.run(
+        [sys.executable, '-c', PROBE % {'case': case, 'timeout': timeout}],
+        cwd=BACKEND_DIR, capture_output=True, text=True, env=env, timeout=timeout * 4
+    )
+    lines = result.stdout.strip().splitlines()
+    return bool(lines) and lines[-1] == 'ok'
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--timeout', type=float, default=30.0, help='seconds the child has to become ready')
+    args = parser.parse_args()
+
+    failed = False
+    for case in ('warm-up', 'locks'):
+        ok = run_case(case, args.timeout)
+        failed = failed or not ok
+        print(f"{case:<8} {'OK' if ok else 'FAILED: forked child never became ready'}")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
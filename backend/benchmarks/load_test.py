@@ -0,0 +1,212 @@
+"""
+Concurrent load test driving simulated users through chat and questionnaire sessions
+
+Each simulated user is a thread that runs whole sessions back to back: a
+chat session starts, sends a few synthetic messages, asks for the analysis
+and ends; a questionnaire session answers questions until it completes.
+Requests go through the Flask test client in this process, or to a running
+server with --url. The report gives throughput, p50/p95/p99 latency and
+error rate per endpoint.
+
+Run from the backend directory:
+    python benchmarks/load_test.py [--users N] [--duration SECONDS] [--url http://localhost:5000]
+"""
+import argparse
+import itertools
+import json
+import os
+import random
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+from collections import defaultdict
+
+os.environ.setdefault('MINDEASE_WARM_UP_ON_START', '0')
+os.environ.setdefault('MINDEASE_MODEL_RELOAD_INTERVAL_SECONDS', '0')
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from synthetic import ANSWERS, SyntheticCorpus  # noqa: E402
+
+# Upper bound on answers per questionnaire session, in case it never completes
+MAX_ANSWERS = 200
+
+
+class InProcessClient:
+    """Sends requests through the Flask test client"""
+
+    def __init__(self):
+        import app as app_module
+        # Load the model up front, as a warmed-up server would have
+        app_module._warm_up_handlers()
+        self.client = app_module.app.test_client()
+
+    def request(self, method, path, body=None):
+        response = self.client.open(path, method=method, json=body)
+        return response.status_code, response.get_json(silent=True)
+
+
+class HttpClient:
+    """Sends requests to a running server with urllib"""
+
+    def __init__(self, base_url, timeout=30):
+        self.base_url = base_url.rstrip('/')
+        self.timeout = timeout
+
+    def request(self, method, path, body=None):
+        data = json.dumps(body).encode('utf-8') if body is not None else None
+        request = urllib.request.Request(
+            self.base_url + path, data=data, method=method,
+            headers={'Content-Type': 'application/json'}
+        )
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                return response.status, json.loads(response.read() or b'null')
+        except urllib.error.HTTPError as e:
+            return e.code, None
+
+
+class Recorder:
+    """Per-user latency and error records, merged after the run"""
+
+    def __init__(self):
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(int)
+
+    def call(self, client, endpoint, method, path, body=None):
+        started = time.perf_counter()
+        try:
+            status, data = client.request(method, path, body)
+        except Exception:
+            status, data = None, None
+        self.latencies[endpoint].append(time.perf_counter() - started)
+        if status is None or status >= 400:
+            self.errors[endpoint] += 1
+            return None
+        return data
+
+
+def run_chat_session(client, recorder, session_id, corpus, rng, args):
+    if not recorder.call(client, 'POST /api/start-session', 'POST', '/api/start-session',
+                         {'type': 'chat', 'session_id': session_id}):
+        return
+    for message in corpus.messages(rng.randint(1, args.max_messages)):
+        recorder.call(client, 'POST /api/chat/message', 'POST', '/api/chat/message',
+                      {'session_id': session_id, 'message': message})
+        if args.think_time:
+            time.sleep(rng.uniform(0, args.think_time))
+    recorder.call(client, 'POST /api/chat/analyze', 'POST', '/api/chat/analyze', {'session_id': session_id})
+    recorder.call(client, 'DELETE /api/session/<id>', 'DELETE', f'/api/session/{session_id}')
+
+
+def run_questionnaire_session(client, recorder, session_id, rng, args):
+    data = recorder.call(client, 'POST /api/start-session', 'POST', '/api/start-session',
+                         {'type': 'questionnaire', 'session_id': session_id})
+    for _ in range(MAX_ANSWERS):
+        if not data or data.get('completed'):
+            break
+        # Answer from the question's options when it has them
+        answer = rng.choice(data['question'].get('options') or ANSWERS)
+        data = recorder.call(client, 'POST /api/questionnaire/answer', 'POST', '/api/questionnaire/answer',
+                             {'session_id': session_id, 'answer': answer})
+        if args.think_time:
+            time.sleep(rng.uniform(0, args.think_time))
+    recorder.call(client, 'DELETE /api/session/<id>', 'DELETE', f'/api/session/{session_id}')
+
+
+def run_user(client, recorder, user, deadline, args):
+    rng = random.Random(args.seed + user)
+    corpus = SyntheticCorpus(args.seed + user)
+    for session in itertools.count():
+        if time.perf_counter() >= deadline:
+            return
+        # Timestamp ids generated by the server can collide between concurrent users
+        session_id = f'load-{user}-{session}'
+        if rng.random() < args.chat_share:
+            run_chat_session(client, recorder, session_id, corpus, rng, args)
+        else:
+            run_questionnaire_session(client, recorder, session_id, rng, args)
+
+
+def percentile(sorted_values, fraction):
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * fraction))]
+
+
+def summarize(recorders, elapsed):
+    """Merge the user recorders into {endpoint: statistics}"""
+    latencies = defaultdict(list)
+    errors = defaultdict(int)
+    for recorder in recorders:
+        for endpoint, values in recorder.latencies.items():
+            latencies[endpoint].extend(values)
+        for endpoint, count in recorder.errors.items():
+            errors[endpoint] += count
+
+    report = {}
+    for endpoint in sorted(latencies):
+        values = sorted(latencies[endpoint])
+        report[endpoint] = {
+            'requests': len(values),
+            'throughput_rps': round(len(values) / elapsed, 1),
+            'p50_ms': round(percentile(values, 0.50) * 1e3, 2),
+            'p95_ms': round(percentile(values, 0.95) * 1e3, 2),
+            'p99_ms': round(percentile(values, 0.99) * 1e3, 2),
+            'error_rate': round(errors[endpoint] / len(values), 4)
+        }
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--users', type=int, default=32, help='concurrent simulated users')
+    parser.add_argument('--duration', type=float, default=20.0, help='seconds to run')
+    parser.add_argument('--url', help='base URL of a running server (default: in-process test client)')
+    parser.add_argument('--chat-share', type=float, default=0.7, help='fraction of sessions that are chats')
+    parser.add_argument('--max-messages', type=int, default=8, help='most messages per chat session')
+    parser.add_argument('--think-time', type=float, default=0.0, help='longest pause between user turns, seconds')
+    parser.add_argument('--seed', type=int, default=7)
+    parser.add_argument('--output', help='also write the JSON report to this file')
+    args = parser.parse_args()
+
+    client = HttpClient(args.url) if args.url else InProcessClient()
+    recorders = [Recorder() for _ in range(args.users)]
+    started = time.perf_counter()
+    deadline = started + args.duration
+    threads = [
+        threading.Thread(target=run_user, args=(client, recorders[user], user, deadline, args))
+        for user in range(args.users)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    endpoints = summarize(recorders, elapsed)
+    total = sum(stats['requests'] for stats in endpoints.values())
+    failed = sum(round(stats['error_rate'] * stats['requests']) for stats in endpoints.values())
+    report = {
+        'target': args.url or 'in-process',
+        'users': args.users,
+        'elapsed_seconds': round(elapsed, 2),
+        'requests': total,
+        'throughput_rps': round(total / elapsed, 1),
+        'error_rate': round(failed / total, 4) if total else 0.0,
+        'endpoints': endpoints
+    }
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+            f.write('\n')
+
+    print(f"{report['target']}: {args.users} users, {total} requests in {elapsed:.1f}s, "
+          f"{report['throughput_rps']} req/s, {report['error_rate']:.2%} errors")
+    print(f"{'endpoint':<34}{'requests':>9}{'req/s':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'errors':>8}")
+    for endpoint, stats in endpoints.items():
+        print(f"{endpoint:<34}{stats['requests']:>9}{stats['throughput_rps']:>9}{stats['p50_ms']:>9}"
+              f"{stats['p95_ms']:>9}{stats['p99_ms']:>9}{stats['error_rate']:>8.2%}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,237 @@
+"""
+Hot-path benchmark suite with regression thresholds
+
+Times symptom detection, message processing, condition prediction, symptom
+extraction, chat analysis and the full questionnaire flow on seeded
+synthetic data, and writes the results as JSON. Each case is compared with
+benchmarks/thresholds.json; any p50 or p95 above its threshold is reported
+as a regression and makes the run exit with status 1.
+
+Run from the backend directory:
+    python benchmarks/run_benchmarks.py [--output results.json] [--catalog-size N]
+Record thresholds for the current machine with:
+    python benchmarks/run_benchmarks.py --write-thresholds 3.0
+Every threshold is the measured value x the factor, but never below an
+absolute floor (--threshold-floor, 100us by default): for calls of a few
+microseconds the p95 is mostly timer and scheduler noise, so a relative
+margin alone trips on jitter while the floor still catches a real slowdown.
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+os.environ.setdefault('MINDEASE_WARM_UP_ON_START', '0')
+os.environ.setdefault('MINDEASE_MODEL_RELOAD_INTERVAL_SECONDS', '0')
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import ml_model  # noqa: E402
+from result_cache import ResultCache  # noqa: E402
+from synthetic import SyntheticCorpus, write_catalog  # noqa: E402
+
+THRESHOLDS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'thresholds.json')
+METRICS = ('p50_us', 'p95_us')
+THRESHOLD_FLOOR_US = 100.0
+
+
+def measure(function, inputs, rounds):
+    """Call function once per input for each round, returning latency statistics"""
+    for item in inputs[:10]:
+        function(item)
+    samples = []
+    for _ in range(rounds):
+        for item in inputs:
+            started = time.perf_counter_ns()
+            function(item)
+            samples.append(time.perf_counter_ns() - started)
+    samples.sort()
+    return {
+        'calls': len(samples),
+        'mean_us': round(statistics.fmean(samples) / 1e3, 2),
+        'p50_us': round(samples[len(samples) // 2] / 1e3, 2),
+        'p95_us': round(samples[min(len(samples) - 1, int(len(samples) * 0.95))] / 1e3, 2),
+        'ops_per_sec': round(1e9 * len(samples) / sum(samples), 1)
+    }
+
+
+def load_model(catalog_size, seed, workdir):
+    """The bundled model, or one trained on a synthetic catalog of catalog_size conditions"""
+    if not catalog_size:
+        return ml_model.get_model()
+    data_path = os.path.join(workdir, 'catalog.csv')
+    write_catalog(data_path, catalog_size, random.Random(seed))
+    model = ml_model.MentalHealthModel(data_path=data_path, artifact_dir=workdir, use_artifact=False)
+    # Make the handlers under test use this model
+    ml_model._model_instance = model
+    return model
+
+
+def run_suite(args, model):
+    """Run every case, returning {case name: statistics}"""
+    from chat_handler import ChatHandler
+    from symptom_analyzer import SymptomAnalyzer
+    import app as app_module
+
+    random.seed(args.seed)  # ChatHandler picks responses at random
+    corpus = SyntheticCorpus(args.seed)
+    messages = corpus.messages(args.messages)
+    transcripts = [corpus.transcript(args.turns) for _ in range(args.transcripts)]
+    chat_handler = ChatHandler()
+    analyzer = SymptomAnalyzer()
+    results = {}
+
+    results['chat.detect_symptoms'] = measure(chat_handler._detect_symptoms, messages, args.rounds)
+
+    state = chat_handler.new_conversation_state()
+    history = []
+
+    def process(message):
+        history.append({'role': 'user', 'message': message})
+        chat_handler.process_message(message, history, state)
+    results['chat.process_message'] = measure(process, messages, args.rounds)
+
+    model.prediction_cache = ResultCache(0)
+    results['model.predict_conditions.cold'] = measure(model.predict_conditions, messages, args.rounds)
+    model.prediction_cache = ResultCache(len(messages))
+    model.predict_conditions_batch(messages)
+    results['model.predict_conditions.cached'] = measure(model.predict_conditions, messages, args.rounds)
+
+    analyzer.symptom_cache = ResultCache(0)
+    results['analyzer.extract_symptoms.cold'] = measure(analyzer.extract_symptoms, messages, args.rounds)
+
+    # Chat analysis over whole transcripts, uncached
+    model.prediction_cache = ResultCache(0)
+    sessions = []
+    for transcript in transcripts:
+        symptoms = []
+        term_state = None
+        for entry in transcript:
+            if entry['role'] == 'user':
+                symptoms.extend(chat_handler.scan_symptoms(entry['message']))
+                term_state = analyzer.update_chat_terms(term_state, entry['message'], transcript)
+        sessions.append((symptoms, transcript, term_state))
+    results['analyzer.analyze_chat_symptoms.transcript'] = measure(
+        lambda session: analyzer.analyze_chat_symptoms(session[0], session[1]), sessions, args.rounds
+    )
+    results['analyzer.analyze_chat_symptoms.term_state'] = measure(
+        lambda session: analyzer.analyze_chat_symptoms(*session), sessions, args.rounds
+    )
+    model.prediction_cache = ResultCache()
+
+    client = app_module.app.test_client()
+    question_count = app_module.get_questionnaire_handler().total_questions
+    answer_sets = [corpus.questionnaire_answers(question_count) for _ in range(args.questionnaires)]
+
+    def questionnaire_flow(answers):
+        session_id = client.post('/api/start-session', json={'type': 'questionnaire'}).get_json()['session_id']
+        for answer in answers:
+            if client.post('/api/questionnaire/answer', json={
+                'session_id': session_id, 'answer': answer
+            }).get_json()['completed']:
+                break
+        client.delete(f'/api/session/{session_id}')
+    results['questionnaire.flow'] = measure(questionnaire_flow, answer_sets, args.rounds)
+
+    return results
+
+
+def check_thresholds(results, thresholds):
+    """List the metrics that exceed their thresholds"""
+    regressions = []
+    for case, limits in thresholds.get('cases', {}).items():
+        measured = results.get(case)
+        if measured is None:
+            continue
+        for metric in METRICS:
+            if metric in limits and measured[metric] > limits[metric]:
+                regressions.append({
+                    'case': case,
+                    'metric': metric,
+                    'measured': measured[metric],
+                    'threshold': limits[metric]
+                })
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--seed', type=int, default=7)
+    parser.add_argument('--messages', type=int, default=300, help='synthetic messages per case')
+    parser.add_argument('--transcripts', type=int, default=20)
+    parser.add_argument('--turns', type=int, default=50, help='user turns per transcript')
+    parser.add_argument('--questionnaires', type=int, default=20)
+    parser.add_argument('--catalog-size', type=int, default=0, help='synthetic conditions (0: bundled dataset)')
+    parser.add_argument('--rounds', type=int, default=3)
+    parser.add_argument('--output', help='write the JSON report here instead of stdout')
+    parser.add_argument('--thresholds', default=THRESHOLDS_PATH)
+    parser.add_argument('--write-thresholds', type=float, metavar='FACTOR',
+                        help='save measured p50/p95 x FACTOR as the new thresholds')
+    parser.add_argument('--threshold-floor', type=float, default=THRESHOLD_FLOOR_US, metavar='US',
+                        help='lowest threshold --write-thresholds records, in microseconds')
+    args = parser.parse_args()
+
+    params = {key: getattr(args, key) for key in ('seed', 'messages', 'transcripts', 'turns',
+                                                  'questionnaires', 'catalog_size', 'rounds')}
+    with tempfile.TemporaryDirectory() as workdir:
+        model = load_model(args.catalog_size, args.seed, workdir)
+        results = run_suite(args, model)
+
+    thresholds = {}
+    if os.path.isfile(args.thresholds):
+        with open(args.thresholds, encoding='utf-8') as f:
+            thresholds = json.load(f)
+    if thresholds.get('params', params) != params:
+        print("Warning: thresholds were recorded with different parameters", file=sys.stderr)
+
+    if args.write_thresholds:
+        thresholds = {
+            'params': params,
+            'factor': args.write_thresholds,
+            'floor_us': args.threshold_floor,
+            'cases': {
+                case: {
+                    metric: max(round(stats[metric] * args.write_thresholds, 1), args.threshold_floor)
+                    for metric in METRICS
+                }
+                for case, stats in results.items()
+            }
+        }
+        with open(args.thresholds, 'w', encoding='utf-8') as f:
+            json.dump(thresholds, f, indent=2, sort_keys=True)
+            f.write('\n')
+        print(f"Wrote thresholds to {args.thresholds}", file=sys.stderr)
+
+    regressions = check_thresholds(results, thresholds)
+    report = {
+        'meta': {
+            'timestamp': datetime.now().isoformat(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'params': params
+        },
+        'results': results,
+        'regressions': regressions
+    }
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(text + '\n')
+    else:
+        print(text)
+
+    for case, stats in results.items():
+        print(f"{case:<44} p50 {stats['p50_us']:>10.1f}us  p95 {stats['p95_us']:>10.1f}us", file=sys.stderr)
+    for regression in regressions:
+        print(f"REGRESSION {regression['case']} {regression['metric']}: "
+              f"{regression['measured']} > {regression['threshold']}", file=sys.stderr)
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == '__main__':
+    main()
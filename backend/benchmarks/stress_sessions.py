@@ -0,0 +1,155 @@
+"""
+Concurrency stress test for session updates
+
+Many threads hammer a handful of shared sessions through the Flask test
+client, then every session is checked for lost or duplicated turns.
+
+Run from the backend directory:
+    python benchmarks/stress_sessions.py [--threads N] [--turns N] [--sessions N] [--processes N]
+Set MINDEASE_SESSION_BACKEND=sqlite to exercise the SQLite store; with
+--processes the threads are split over forked worker processes sharing it.
+"""
+import argparse
+import os
+import sys
+import threading
+import time
+from collections import Counter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import app as app_module  # noqa: E402
+from session_store import SQLiteSessionStore  # noqa: E402
+
+
+def run_chat_worker(client, session_ids, worker, turns, errors):
+    for turn in range(turns):
+        session_id = session_ids[(worker + turn) % len(session_ids)]
+        response = client.post('/api/chat/message', json={
+            'session_id': session_id,
+            'message': f"worker {worker} turn {turn}: I feel anxious and tired"
+        })
+        if response.status_code != 200:
+            errors.append((worker, turn, response.status_code))
+
+
+def run_questionnaire_worker(client, session_id, worker, turns, errors):
+    for turn in range(turns):
+        response = client.post('/api/questionnaire/answer', json={
+            'session_id': session_id,
+            'answer': f"w{worker}-t{turn}"
+        })
+        if response.status_code != 200:
+            errors.append((worker, turn, response.status_code))
+
+
+def check_chat_session(client, session_id, expected_messages):
+    session = client.get(f'/api/session/{session_id}').get_json()
+    user_messages = [m['message'] for m in session['chat_history'] if m['role'] == 'user']
+    roles = [m['role'] for m in session['chat_history']]
+    problems = []
+    duplicated = [msg for msg, count in Counter(user_messages).items() if count > 1]
+    if duplicated:
+        problems.append(f"{len(duplicated)} duplicated turns")
+    missing = expected_messages - set(user_messages)
+    if missing:
+        problems.append(f"{len(missing)} lost turns")
+    if roles != ['user', 'bot'] * (len(roles) // 2):
+        problems.append("user/bot turns interleaved")
+    if session['conversation']['user_turns'] != len(user_messages):
+        problems.append("conversation turn count out of sync with history")
+    return len(user_messages), problems
+
+
+def run_workers(client, session_ids, questionnaire_id, args, rank):
+    """Run this process's share of the workers, returning the request errors"""
+    errors = []
+    threads = [
+        threading.Thread(target=run_chat_worker,
+                         args=(client, session_ids, worker, args.turns, errors))
+        for worker in range(rank, args.threads, args.processes)
+    ]
+    # Questionnaire answers are capped by the question bank length
+    answers_per_worker = 1
+    threads += [
+        threading.Thread(target=run_questionnaire_worker,
+                         args=(client, questionnaire_id, worker, answers_per_worker, errors))
+        for worker in range(rank, min(args.threads, 20), args.processes)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return errors
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--threads', type=int, default=16)
+    parser.add_argument('--turns', type=int, default=50)
+    parser.add_argument('--sessions', type=int, default=4)
+    parser.add_argument('--processes', type=int, default=1)
+    args = parser.parse_args()
+    if args.processes > 1 and not isinstance(app_module.session_store, SQLiteSessionStore):
+        parser.error('--processes needs MINDEASE_SESSION_BACKEND=sqlite')
+
+    client = app_module.app.test_client()
+    session_ids = [
+        client.post('/api/start-session', json={'type': 'chat'}).get_json()['session_id']
+        for _ in range(args.sessions)
+    ]
+    questionnaire_id = client.post(
+        '/api/start-session', json={'type': 'questionnaire', 'session_id': 'stress-questionnaire'}
+    ).get_json()['session_id']
+
+    expected = {session_id: set() for session_id in session_ids}
+    for worker in range(args.threads):
+        for turn in range(args.turns):
+            session_id = session_ids[(worker + turn) % len(session_ids)]
+            expected[session_id].add(f"worker {worker} turn {turn}: I feel anxious and tired")
+
+    started = time.perf_counter()
+    children = []
+    rank = 0
+    for child_rank in range(1, args.processes):
+        pid = os.fork()
+        if pid == 0:
+            rank, children = child_rank, []
+            break
+        children.append(pid)
+    errors = run_workers(client, session_ids, questionnaire_id, args, rank)
+    if rank:
+        os._exit(1 if errors else 0)
+    failed_processes = 0
+    for pid in children:
+        _, status = os.waitpid(pid, 0)
+        failed_processes += os.waitstatus_to_exitcode(status) != 0
+    elapsed = time.perf_counter() - started
+
+    failed = bool(errors) or bool(failed_processes)
+    total_turns = 0
+    for session_id in session_ids:
+        count, problems = check_chat_session(client, session_id, expected[session_id])
+        total_turns += count
+        if problems:
+            failed = True
+            print(f"session {session_id}: " + ', '.join(problems))
+
+    questionnaire = client.get(f'/api/session/{questionnaire_id}').get_json()
+    answers = [r['answer'] for r in questionnaire['responses']]
+    indices = [r['question_index'] for r in questionnaire['responses']]
+    if len(set(answers)) != len(answers) or indices != list(range(len(indices))) \
+            or questionnaire['current_question'] != len(answers):
+        failed = True
+        print("questionnaire session: lost or duplicated answers")
+
+    print(f"backend: {type(app_module.session_store).__name__}")
+    print(f"{total_turns} chat turns and {len(answers)} answers from {args.threads} threads "
+          f"in {args.processes} process(es) in {elapsed:.2f}s, {len(errors)} request errors"
+          + (f", {failed_processes} worker processes with errors" if failed_processes else ''))
+    print("FAILED" if failed else "OK: no lost or duplicated turns")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,93 @@
+"""
+Seeded synthetic data for benchmarks: messages, transcripts, questionnaire
+answers and condition catalogs
+
+Every generator draws from its own random.Random, so the same seed always
+produces the same data.
+"""
+import csv
+import random
+
+SYMPTOM_PHRASES = [
+    'sad', 'hopeless', 'feeling low', 'lost interest', 'crying',
+    'anxious', 'worried', 'on edge', 'overthinking', 'panic',
+    "can't sleep", 'nightmares', 'wake up', 'tired all day',
+    'exhausted', 'no energy', "can't focus", 'forgetful',
+    'lonely', 'isolated', 'worthless', 'angry', 'irritable',
+    'heart racing', "can't breathe", 'overwhelmed', 'stressed out'
+]
+
+OPENINGS = [
+    "I've been feeling", 'Lately I am', 'Most days I feel', 'At work I get',
+    'Since the move I have been', 'My friends say I seem', 'At night I am',
+    'I keep feeling', 'Honestly I feel'
+]
+
+FILLER = [
+    'really', 'kind of', 'a bit', 'very', 'so', 'more and more', 'all the time',
+    'and', 'because of everything', 'for weeks now', 'even on weekends',
+    'when I am alone', 'around other people', 'at school', 'after work'
+]
+
+ANSWERS = ['Yes', 'No', 'Never', 'Rarely', 'Sometimes', 'Often', 'Always', 'Poor', 'Good']
+
+
+def synthetic_word(index):
+    """Deterministic pronounceable pseudo-word for a vocabulary index"""
+    consonants, vowels = 'bdfgklmnprstvz', 'aeiou'
+    word = ''
+    index += 1
+    while index:
+        index, c = divmod(index, len(consonants))
+        index, v = divmod(index, len(vowels))
+        word += consonants[c] + vowels[v]
+    return word + 'x'
+
+
+class SyntheticCorpus:
+    """Generates user messages, transcripts and questionnaire answers from a seed"""
+
+    def __init__(self, seed=7):
+        self.rng = random.Random(seed)
+
+    def message(self, min_words=4, max_words=30):
+        """One user message mixing symptom phrases with everyday filler"""
+        rng = self.rng
+        parts = [rng.choice(OPENINGS)]
+        target = rng.randint(min_words, max_words)
+        while sum(len(part.split()) for part in parts) < target:
+            parts.append(rng.choice(SYMPTOM_PHRASES) if rng.random() < 0.35 else rng.choice(FILLER))
+        return ' '.join(parts)
+
+    def messages(self, count, **kwargs):
+        return [self.message(**kwargs) for _ in range(count)]
+
+    def transcript(self, turns):
+        """Chat history of alternating user and bot turns"""
+        history = []
+        for _ in range(turns):
+            history.append({'role': 'user', 'message': self.message()})
+            history.append({'role': 'bot', 'message': {'message': 'Tell me more.', 'type': 'question'}})
+        return history
+
+    def questionnaire_answers(self, question_count):
+        """Answers for every question, as the answer endpoint would receive them"""
+        return [self.rng.choice(ANSWERS) for _ in range(question_count)]
+
+
+def write_catalog(path, size, rng):
+    """Write a CSV of `size` conditions whose vocabulary grows with the catalog
+
+    Returns the vocabulary so queries can be drawn from it.
+    """
+    vocabulary = [synthetic_word(i) for i in range(size * 3)]
+    with open(path, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(['condition', 'symptoms'])
+        for i in range(size):
+            phrases = [
+                ' '.join(rng.choice(vocabulary) for _ in range(rng.randint(1, 3)))
+                for _ in range(rng.randint(4, 10))
+            ]
+            writer.writerow([f'Condition {i}', ', '.join(phrases)])
+    return vocabulary
@@ -0,0 +1,249 @@
+"""
+Bulk Scoring - Score archived transcripts and questionnaires offline
+
+Reads records from a JSONL or CSV file and writes one JSONL result per
+record, in completion order. Records are scored in chunks by a pool of
+worker processes, each of which loads the model and handlers once.
+
+Input records (JSONL objects, or CSV rows with the same column names):
+    id          optional, copied to the output
+    messages    a transcript: a list of user messages, or chat history
+                entries with 'role' and 'message'
+    text        a single-message transcript
+    responses   questionnaire responses with 'question_index' and 'answer'
+    answers     questionnaire answers as {question index: answer}
+CSV cells holding messages, responses or answers are JSON encoded.
+
+Each output line is {"line", "id", "type", "results"}, or {"line", "id",
+"error"} for records that could not be scored.
+
+Usage (from the backend directory):
+    python bulk_score.py INPUT [-o OUTPUT] [--workers N] [--chunk-size N]
+"""
+import argparse
+import csv
+import itertools
+import json
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+# Handlers loaded once per worker process by _init_worker
+_worker = {}
+
+
+def _init_worker():
+    """Load the model and handlers in a worker process before it takes work"""
+    from chat_handler import ChatHandler
+    from ml_model import get_model
+    from symptom_analyzer import SymptomAnalyzer
+
+    # Keep the handlers' log lines out of results written to stdout
+    sys.stdout = sys.stderr
+    get_model()
+    _worker['chat_handler'] = ChatHandler()
+    _worker['symptom_analyzer'] = SymptomAnalyzer()
+
+
+def read_records(path):
+    """Yield (line number, record) from a JSONL or CSV file, streaming"""
+    with open(path, encoding='utf-8', newline='') as f:
+        if path.lower().endswith('.csv'):
+            for line, row in enumerate(csv.DictReader(f), 2):
+                yield line, _parse_csv_row(row)
+        else:
+            for line, text in enumerate(f, 1):
+                if text.strip():
+                    try:
+                        yield line, json.loads(text)
+                    except ValueError as e:
+                        yield line, {'_error': f'Invalid JSON: {e}'}
+
+
+def _parse_csv_row(row):
+    record = {key: value for key, value in row.items() if key and value not in (None, '')}
+    for key in ('messages', 'responses', 'answers'):
+        if key in record:
+            try:
+                record[key] = json.loads(record[key])
+            except ValueError as e:
+                return {'id': record.get('id'), '_error': f'Invalid JSON in {key}: {e}'}
+    return record
+
+
+def score_chunk(chunk):
+    """Score a list of (line, record) in a worker, returning output dicts"""
+    outputs = {}
+    questionnaires = []
+    for line, record in chunk:
+        try:
+            if not isinstance(record, dict):
+                raise ValueError('Record must be an object')
+            if '_error' in record:
+                raise ValueError(record['_error'])
+            if 'responses' in record or 'answers' in record:
+                questionnaires.append((line, record, _questionnaire_responses(record)))
+            else:
+                outputs[line] = _output(line, record, 'chat', _score_transcript(record))
+        except (ValueError, TypeError, KeyError) as e:
+            outputs[line] = _error(line, record, e)
+
+    if questionnaires:
+        # All questionnaires in the chunk go through one matrix product
+        batch_results = _worker['symptom_analyzer'].analyze_questionnaire_batch(
+            [responses for _, _, responses in questionnaires]
+        )
+        for (line, record, _), results in zip(questionnaires, batch_results):
+            outputs[line] = _output(line, record, 'questionnaire', results)
+
+    return [outputs[line] for line, _ in chunk]
+
+
+def _score_transcript(record):
+    messages = record.get('messages')
+    if messages is None:
+        if not isinstance(record.get('text'), str):
+            raise ValueError("Record needs 'messages', 'text', 'responses' or 'answers'")
+        messages = [record['text']]
+    if not isinstance(messages, list):
+        raise ValueError("'messages' must be a list")
+
+    chat_history = [
+        message if isinstance(message, dict) else {'role': 'user', 'message': str(message)}
+        for message in messages
+    ]
+    for message in chat_history:
+        if message.get('role') == 'user' and not isinstance(message.get('message'), str):
+            raise ValueError("Every user message must have a string 'message'")
+    chat_handler = _worker['chat_handler']
+    symptoms = []
+    for message in chat_history:
+        if message.get('role') == 'user':
+            symptoms.extend(chat_handler.scan_symptoms(message['message']))
+    return _worker['symptom_analyzer'].analyze_chat_symptoms(symptoms, chat_history)
+
+
+def _questionnaire_responses(record):
+    """Validated responses of a questionnaire record, with integer question indices
+    
+    Records are checked here, one at a time, because the chunk's
+    questionnaires are then scored together and one bad record would
+    fail the whole batch.
+    """
+    if 'responses' in record:
+        responses = record['responses']
+        if not isinstance(responses, list):
+            raise ValueError("'responses' must be a list")
+        if not all(isinstance(response, dict) and 'question_index' in response for response in responses):
+            raise ValueError("Every response must be an object with a 'question_index'")
+        pairs = [(response['question_index'], response.get('answer')) for response in responses]
+    else:
+        answers = record['answers']
+        if not isinstance(answers, dict):
+            raise ValueError("'answers' must be an object")
+        pairs = list(answers.items())
+    
+    try:
+        return [{'question_index': int(index), 'answer': answer} for index, answer in pairs]
+    except (ValueError, TypeError):
+        raise ValueError('Question indices must be integers') from None
+
+
+def _output(line, record, record_type, results):
+    return {'line': line, 'id': record.get('id'), 'type': record_type, 'results': results}
+
+
+def _error(line, record, error):
+    record_id = record.get('id') if isinstance(record, dict) else None
+    return {'line': line, 'id': record_id, 'error': str(error)}
+
+
+def chunked(iterable, size):
+    """Yield lists of up to size items"""
+    iterator = iter(iterable)
+    while True:
+        chunk = list(itertools.islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+class Progress:
+    """Throttled progress and throughput reporting on stderr"""
+
+    def __init__(self, interval=2.0, stream=sys.stderr):
+        self.interval = interval
+        self.stream = stream
+        self.records = 0
+        self.errors = 0
+        self.started = time.perf_counter()
+        self._last_report = self.started
+
+    def update(self, outputs):
+        self.records += len(outputs)
+        self.errors += sum('error' in output for output in outputs)
+        now = time.perf_counter()
+        if now - self._last_report >= self.interval:
+            self._last_report = now
+            self.report()
+
+    def report(self, final=False):
+        elapsed = time.perf_counter() - self.started
+        rate = self.records / elapsed if elapsed else 0.0
+        label = 'Done' if final else 'Progress'
+        print(f"{label}: {self.records} records ({self.errors} errors) in {elapsed:.1f}s, "
+              f"{rate:.1f} records/s", file=self.stream, flush=True)
+
+
+def run(input_path, output, workers, chunk_size, max_in_flight=None, progress=None):
+    """Score every record of input_path, writing JSONL lines to output as chunks complete
+
+    At most max_in_flight chunks (default: two per worker) are read ahead,
+    so memory stays bounded whatever the input size.
+    """
+    max_in_flight = max_in_flight or workers * 2
+    progress = progress or Progress()
+    chunks = chunked(read_records(input_path), chunk_size)
+
+    def write(done):
+        for future in done:
+            outputs = future.result()
+            for result in outputs:
+                output.write(json.dumps(result, ensure_ascii=False) + '\n')
+            output.flush()
+            progress.update(outputs)
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+        in_flight = set()
+        for chunk in chunks:
+            if len(in_flight) >= max_in_flight:
+                done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                write(done)
+            in_flight.add(pool.submit(score_chunk, chunk))
+        while in_flight:
+            done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+            write(done)
+
+    progress.report(final=True)
+    return progress
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Score archived transcripts and questionnaires offline')
+    parser.add_argument('input', help='JSONL or CSV file of records')
+    parser.add_argument('-o', '--output', help='JSONL results file (default: stdout)')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--chunk-size', type=int, default=200, help='records per task sent to a worker')
+    parser.add_argument('--max-in-flight', type=int, help='chunks queued or running at once (default: 2 per worker)')
+    args = parser.parse_args()
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as output:
+            run(args.input, output, args.workers, args.chunk_size, args.max_in_flight)
+    else:
+        run(args.input, sys.stdout, args.workers, args.chunk_size, args.max_in_flight)
+
+
+if __name__ == '__main__':
+    main()
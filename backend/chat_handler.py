@@ -1,69 +1,72 @@
-import re
 import random
 from datetime import datetime
+from metrics import timed
+from phrase_matcher import PhraseMatcher
+import server_timing
 
 
 class ChatHandler:
     """Handles natural language chat-based mental health assessment with 5-level conversation"""
     
     def __init__(self):
-        self.symptom_patterns = self._load_symptom_patterns()
+        self.symptom_phrases = self._load_symptom_phrases()
+        self.symptom_scanner = PhraseMatcher(self.symptom_phrases)
         self.level_responses = self._load_level_responses()
         self.empathy_responses = self._load_empathy_responses()
         self.symptom_suggestions = self._load_symptom_suggestions()
     
-    def _load_symptom_patterns(self):
-        """Load regex patterns for symptom detection"""
+    def _load_symptom_phrases(self):
+        """Load the phrases used for symptom detection, grouped by category"""
         return {
             'sadness': [
-                r'\b(sad|depressed|down|unhappy|miserable|hopeless|empty|low mood)\b',
-                r'\b(feeling low|feeling blue|no joy|lost interest)\b',
-                r'\b(crying|tears|grief)\b'
+                'sad', 'depressed', 'down', 'unhappy', 'miserable', 'hopeless', 'empty', 'low mood',
+                'feeling low', 'feeling blue', 'no joy', 'lost interest',
+                'crying', 'tears', 'grief'
             ],
             'anxiety': [
-                r'\b(anxious|worried|nervous|tense|stressed|panic|fear)\b',
-                r'\b(can\'t relax|on edge|restless|uneasy)\b',
-                r'\b(worry|worrying|overthinking)\b'
+                'anxious', 'worried', 'nervous', 'tense', 'stressed', 'panic', 'fear',
+                "can't relax", 'on edge', 'restless', 'uneasy',
+                'worry', 'worrying', 'overthinking'
             ],
             'sleep': [
-                r'\b(can\'t sleep|insomnia|trouble sleeping|sleep problems|sleepless)\b',
-                r'\b(sleeping too much|oversleeping|tired all day)\b',
-                r'\b(nightmares|bad dreams|wake up)\b'
+                "can't sleep", 'insomnia', 'trouble sleeping', 'sleep problems', 'sleepless',
+                'sleeping too much', 'oversleeping', 'tired all day',
+                'nightmares', 'bad dreams', 'wake up'
             ],
             'energy': [
-                r'\b(tired|fatigue|exhausted|no energy|drained|weak)\b',
-                r'\b(can\'t get out of bed|too tired|lethargic)\b'
+                'tired', 'fatigue', 'exhausted', 'no energy', 'drained', 'weak',
+                "can't get out of bed", 'too tired', 'lethargic'
             ],
             'concentration': [
-                r'\b(can\'t focus|can\'t concentrate|distracted|unfocused)\b',
-                r'\b(trouble thinking|mind racing|foggy|confused)\b',
-                r'\b(forgetful|memory)\b'
+                "can't focus", "can't concentrate", 'distracted', 'unfocused',
+                'trouble thinking', 'mind racing', 'foggy', 'confused',
+                'forgetful', 'memory'
             ],
             'social': [
-                r'\b(avoid people|avoiding|don\'t want to see anyone|isolated)\b',
-                r'\b(alone|lonely|withdrawn)\b',
-                r'\b(scared of people|judgment|embarrassed)\b'
+                'avoid people', 'avoiding', "don't want to see anyone", 'isolated',
+                'alone', 'lonely', 'withdrawn',
+                'scared of people', 'judgment', 'embarrassed'
             ],
             'panic': [
-                r'\b(panic|heart racing|palpitations)\b',
-                r'\b(can\'t breathe|shortness of breath|chest)\b',
-                r'\b(sudden fear|intense fear)\b'
+                'panic', 'heart racing', 'palpitations',
+                "can't breathe", 'shortness of breath', 'chest',
+                'sudden fear', 'intense fear'
             ],
             'appetite': [
-                r'\b(no appetite|not eating|lost weight|overeating)\b',
-                r'\b(eating too much|weight gain|binge)\b'
+                'no appetite', 'not eating', 'lost weight', 'overeating',
+                'eating too much', 'weight gain', 'binge'
             ],
             'mood_swings': [
-                r'\b(mood swings|ups and downs|irritable|angry)\b',
-                r'\b(emotional|crying easily|outbursts)\b'
+                'mood swings', 'ups and downs', 'irritable', 'angry',
+                'emotional', 'crying easily', 'outbursts'
             ],
             'worthlessness': [
-                r'\b(worthless|useless|failure|burden|guilty)\b',
-                r'\b(hate myself|self-blame|shame)\b'
+                'worthless', 'useless', 'failure', 'burden', 'guilty',
+                'hate myself', 'self-blame', 'shame'
             ],
             'suicidal': [
-                r'\b(suicide|suicidal|kill myself|end my life|want to die)\b',
-                r'\b(better off dead|no point living)\b'
+                'suicide', 'suicidal', 'kill myself', 'end my life', 'want to die',
+                'better off dead', 'no point living'
             ]
         }
     
@@ -160,37 +163,73 @@ class ChatHandler:
             'level': 1
         }
     
-    def process_message(self, user_message, chat_history):
-        """Process user message and generate level-based response"""
+    def new_conversation_state(self):
+        """Create the running per-session state used by process_message"""
+        return {
+            'user_turns': 0,
+            'symptom_counts': {},
+            'primary_symptom': None
+        }
+    
+    def build_conversation_state(self, chat_history):
+        """Rebuild conversation state from a full chat history"""
+        state = self.new_conversation_state()
+        for msg in chat_history:
+            if msg['role'] == 'user':
+                self._update_conversation_state(state, self._detect_symptoms(msg['message']))
+        return state
+    
+    def _update_conversation_state(self, state, symptoms):
+        """Fold one user turn into the running state"""
+        state['user_turns'] += 1
+        counts = state['symptom_counts']
+        primary = state['primary_symptom']
+        
+        for symptom in symptoms:
+            counts[symptom] = counts.get(symptom, 0) + 1
+            # Most frequently mentioned symptom wins, earliest on ties
+            if primary is None or counts[symptom] > counts[primary]:
+                primary = symptom
+        
+        state['primary_symptom'] = primary
+    
+    def process_message(self, user_message, chat_history, state=None):
+        """Process user message and generate level-based response
+        
+        When a conversation state is given it is updated in place with this
+        turn, so the cost is independent of the history length. Without one,
+        the state is rebuilt from chat_history, which must already contain
+        user_message.
+        """
         symptoms_detected = self._detect_symptoms(user_message)
         
+        if state is None:
+            state = self.build_conversation_state(chat_history)
+        else:
+            self._update_conversation_state(state, symptoms_detected)
+        
         if self._is_crisis(symptoms_detected):
             return self._generate_crisis_response(), symptoms_detected
         
-        user_messages = [msg for msg in chat_history if msg['role'] == 'user']
-        level = min(len(user_messages) + 1, 5)
-        
-        all_symptoms = set(symptoms_detected)
-        for msg in chat_history:
-            if msg['role'] == 'user':
-                all_symptoms.update(self._detect_symptoms(msg['message']))
+        level = min(state['user_turns'] + 1, 5)
         
-        response = self._generate_level_response(level, list(all_symptoms), symptoms_detected)
+        response = self._generate_level_response(level, state['primary_symptom'], symptoms_detected)
         
         return response, symptoms_detected
     
+    @timed('detect_symptoms')
+    @server_timing.timed('detect')
     def _detect_symptoms(self, text):
         """Detect symptoms in user message"""
-        text_lower = text.lower()
-        detected = []
-        
-        for symptom_category, patterns in self.symptom_patterns.items():
-            for pattern in patterns:
-                if re.search(pattern, text_lower):
-                    detected.append(symptom_category)
-                    break
-        
-        return detected
+        return list(self.scan_symptoms(text))
+    
+    def scan_symptoms(self, text):
+        """Detect symptoms in one pass, returning {category: [(start, end), ...]}"""
+        return self.symptom_scanner.scan(text.lower())
+    
+    def crisis_response(self, symptoms):
+        """Return the crisis response if any of the symptoms indicate a crisis, else None"""
+        return self._generate_crisis_response() if self._is_crisis(symptoms) else None
     
     def _is_crisis(self, symptoms):
         """Check if message indicates crisis"""
@@ -208,7 +247,7 @@ class ChatHandler:
             ]
         }
     
-    def _generate_level_response(self, level, all_symptoms, current_symptoms):
+    def _generate_level_response(self, level, primary_symptom, current_symptoms):
         """Generate response based on conversation level"""
         empathy = random.choice(self.empathy_responses)
         
@@ -225,10 +264,8 @@ class ChatHandler:
             # Level 4: Suggest related symptoms based on what's detected
             suggestion = "Based on what you've shared, have you also noticed any physical tension, changes in your daily routine, or feeling overwhelmed?"
             
-            if all_symptoms:
-                primary_symptom = all_symptoms[0]
-                if primary_symptom in self.symptom_suggestions:
-                    suggestion = self.symptom_suggestions[primary_symptom]['question']
+            if primary_symptom in self.symptom_suggestions:
+                suggestion = self.symptom_suggestions[primary_symptom]['question']
             
             response_template = random.choice(self.level_responses[4])
             response = response_template.format(suggestion=suggestion)
@@ -238,7 +275,7 @@ class ChatHandler:
                 'type': 'confirmation',
                 'level': level,
                 'detected_symptoms': current_symptoms,
-                'suggested_symptoms': self.symptom_suggestions.get(all_symptoms[0] if all_symptoms else 'sadness', {}).get('related', [])
+                'suggested_symptoms': self.symptom_suggestions.get(primary_symptom or 'sadness', {}).get('related', [])
             }
         
         else:
@@ -0,0 +1,114 @@
+"""
+Runtime configuration - values can be overridden with environment variables
+"""
+import os
+
+
+def _env_int(name, default):
+    """Read an integer setting from the environment"""
+    value = os.environ.get(name)
+    return int(value) if value else default
+
+
+def _env_float(name, default):
+    """Read a float setting from the environment"""
+    value = os.environ.get(name)
+    return float(value) if value else default
+
+
+def _env_str(name, default):
+    """Read a string setting from the environment"""
+    return os.environ.get(name) or default
+
+
+def _env_bool(name, default):
+    """Read a boolean setting from the environment"""
+    value = os.environ.get(name)
+    if not value:
+        return default
+    return value.strip().lower() in ('1', 'true', 'yes', 'on')
+
+
+# Session store: 'memory' keeps sessions in this process, 'sqlite' shares
+# them between worker processes through a local database file
+SESSION_BACKEND = _env_str('MINDEASE_SESSION_BACKEND', 'memory')
+SESSION_DB_PATH = _env_str(
+    'MINDEASE_SESSION_DB_PATH',
+    os.path.join(os.path.dirname(__file__), 'data', 'sessions.db')
+)
+SESSION_TTL_SECONDS = _env_int('MINDEASE_SESSION_TTL_SECONDS', 30 * 60)
+SESSION_MAX_ENTRIES = _env_int('MINDEASE_SESSION_MAX_ENTRIES', 10000)
+SESSION_MAX_BYTES = _env_int('MINDEASE_SESSION_MAX_BYTES', 256 * 1024 * 1024)
+SESSION_SWEEP_INTERVAL_SECONDS = _env_int('MINDEASE_SESSION_SWEEP_INTERVAL_SECONDS', 60)
+SESSION_BACKGROUND_SWEEP = _env_bool('MINDEASE_SESSION_BACKGROUND_SWEEP', True)
+# Times a request is run again when another worker process saved its
+# session first (SQLite backend only)
+SESSION_CONFLICT_RETRIES = _env_int('MINDEASE_SESSION_CONFLICT_RETRIES', 5)
+
+# Prebuilt model artifacts (see model_artifact.py)
+MODEL_ARTIFACT_DIR = _env_str(
+    'MINDEASE_MODEL_ARTIFACT_DIR',
+    os.path.join(os.path.dirname(__file__), 'data', 'artifacts')
+)
+
+# Load the ML model in a background thread at startup instead of on the
+# first request that needs it
+WARM_UP_ON_START = _env_bool('MINDEASE_WARM_UP_ON_START', True)
+
+# Longest wait, before forking (e.g. gunicorn --preload), for the warm-up
+# started at import to finish
+FORK_WARM_UP_WAIT_SECONDS = _env_int('MINDEASE_FORK_WARM_UP_WAIT_SECONDS', 120)
+
+# Largest number of texts accepted by /api/symptoms/search/batch
+SEARCH_BATCH_MAX_TEXTS = _env_int('MINDEASE_SEARCH_BATCH_MAX_TEXTS', 1000)
+
+# Synonym thesaurus used to expand user text before vectorizing
+SYNONYMS_PATH = _env_str(
+    'MINDEASE_SYNONYMS_PATH',
+    os.path.join(os.path.dirname(__file__), 'data', 'synonyms.json')
+)
+SYNONYM_CACHE_SIZE = _env_int('MINDEASE_SYNONYM_CACHE_SIZE', 4096)
+
+# LRU caches of prediction and symptom extraction results (entries)
+PREDICTION_CACHE_SIZE = _env_int('MINDEASE_PREDICTION_CACHE_SIZE', 4096)
+SYMPTOM_CACHE_SIZE = _env_int('MINDEASE_SYMPTOM_CACHE_SIZE', 4096)
+
+# Longest text whose results the prediction, symptom and synonym caches
+# keep, so whole transcripts cannot fill them. 0 caches texts of any length.
+PREDICTION_CACHE_MAX_CHARS = _env_int('MINDEASE_PREDICTION_CACHE_MAX_CHARS', 1000)
+
+# Seconds between checks of the dataset file for changes; a changed dataset
+# is retrained in the background and swapped in. 0 disables reloading.
+MODEL_RELOAD_INTERVAL_SECONDS = _env_int('MINDEASE_MODEL_RELOAD_INTERVAL_SECONDS', 30)
+
+# Questionnaire question bank and its scoring weights
+QUESTIONS_PATH = _env_str(
+    'MINDEASE_QUESTIONS_PATH',
+    os.path.join(os.path.dirname(__file__), 'data', 'questions.json')
+)
+QUESTIONNAIRE_WEIGHTS_PATH = _env_str(
+    'MINDEASE_QUESTIONNAIRE_WEIGHTS_PATH',
+    os.path.join(os.path.dirname(__file__), 'data', 'questionnaire_weights.json')
+)
+
+# Request and stage latency histograms served at /metrics
+METRICS_ENABLED = _env_bool('MINDEASE_METRICS_ENABLED', True)
+
+# Serialize JSON with orjson when it is installed
+FAST_JSON = _env_bool('MINDEASE_FAST_JSON', True)
+
+# Send Server-Timing headers with stage durations on the chat and search
+# endpoints
+SERVER_TIMING_ENABLED = _env_bool('MINDEASE_SERVER_TIMING_ENABLED', True)
+
+# Per-request profiling (see profiling.py): requests are profiled when they
+# send PROFILE_TOKEN in the X-MindEase-Profile header, or at random at
+# PROFILE_SAMPLE_RATE (0 to 1), at most PROFILE_MAX_PER_MINUTE times a minute.
+# An empty token and a zero rate leave profiling off.
+PROFILE_DIR = _env_str(
+    'MINDEASE_PROFILE_DIR',
+    os.path.join(os.path.dirname(__file__), 'data', 'profiles')
+)
+PROFILE_TOKEN = _env_str('MINDEASE_PROFILE_TOKEN', '')
+PROFILE_SAMPLE_RATE = _env_float('MINDEASE_PROFILE_SAMPLE_RATE', 0.0)
+PROFILE_MAX_PER_MINUTE = _env_int('MINDEASE_PROFILE_MAX_PER_MINUTE', 6)
@@ -0,0 +1,48 @@
+"""
+JSON Provider - App-wide Flask JSON provider that uses orjson when installed
+"""
+from flask.json.provider import DefaultJSONProvider
+import config
+
+try:
+    import orjson
+except ImportError:  # optional dependency; fall back to the stdlib encoder
+    orjson = None
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """Serializes with orjson when it is installed, otherwise like Flask's default
+
+    Output matches the default provider's compact responses: keys sorted,
+    no whitespace, and datetimes, UUIDs and dataclasses handled by the same
+    `default` hook. orjson writes non-ASCII characters as UTF-8 rather than
+    escaping them. Calls that pass json.dumps keyword arguments, and pretty
+    printed debug responses, use the stdlib encoder.
+    """
+
+    def __init__(self, app):
+        super().__init__(app)
+        self.enabled = orjson is not None and config.FAST_JSON
+
+    def _options(self):
+        options = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+        if self.sort_keys:
+            options |= orjson.OPT_SORT_KEYS
+        return options
+
+    def dumps(self, obj, **kwargs):
+        if not self.enabled or kwargs:
+            return super().dumps(obj, **kwargs)
+        return orjson.dumps(obj, default=self.default, option=self._options()).decode('utf-8')
+
+    def loads(self, s, **kwargs):
+        if not self.enabled or kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        if not self.enabled or self.compact is False or (self.compact is None and self._app.debug):
+            return super().response(*args, **kwargs)
+        obj = self._prepare_response_obj(args, kwargs)
+        body = orjson.dumps(obj, default=self.default, option=self._options() | orjson.OPT_APPEND_NEWLINE)
+        return self._app.response_class(body, mimetype=self.mimetype)
@@ -0,0 +1,189 @@
+"""
+Metrics - Prometheus text-format histograms and gauges
+
+Histograms keep one shard per thread, so observing a value touches only
+the calling thread's shard and takes no lock. Scraping sums the shards.
+Shards of threads that have exited are folded into a retired total on
+every scrape and whenever a thread adds its shard, so thread-per-request
+servers do not grow the shard list even when nothing scrapes.
+Each process keeps its own metrics.
+"""
+import threading
+import time
+from bisect import bisect_left
+from functools import wraps
+
+import config
+
+# Latency buckets in seconds, from sub-millisecond lookups to slow analyses
+DEFAULT_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025,
+                   0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(names, values, extra=''):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def _format_number(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Histogram:
+    """Histogram of observed values, labelled by labelnames, with per-thread shards"""
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._local = threading.local()
+        self._lock = threading.Lock()  # guards the shard list, not the shards
+        self._shards = []  # (thread, {label values: series})
+        self._retired = {}
+
+    def observe(self, value, *labelvalues):
+        """Record one value; series are [count per bucket..., count above all buckets, sum]"""
+        shard = getattr(self._local, 'shard', None)
+        if shard is None:
+            shard = self._new_shard()
+        series = shard.get(labelvalues)
+        if series is None:
+            series = shard[labelvalues] = [0] * (len(self.buckets) + 1) + [0.0]
+        series[bisect_left(self.buckets, value)] += 1
+        series[-1] += value
+
+    def time(self, *labelvalues):
+        """Decorator that observes the duration of each call"""
+        def decorator(function):
+            @wraps(function)
+            def wrapper(*args, **kwargs):
+                started = time.perf_counter()
+                try:
+                    return function(*args, **kwargs)
+                finally:
+                    self.observe(time.perf_counter() - started, *labelvalues)
+            return wrapper
+        return decorator
+
+    def _new_shard(self):
+        shard = self._local.shard = {}
+        with self._lock:
+            # Retire here too, so the list stays bounded when nothing scrapes
+            self._retire_dead_shards()
+            self._shards.append((threading.current_thread(), shard))
+        return shard
+
+    def _retire_dead_shards(self):
+        """Fold shards of exited threads into the retired total; needs self._lock"""
+        live = []
+        for thread, shard in self._shards:
+            if thread.is_alive():
+                live.append((thread, shard))
+            else:
+                # The thread can no longer write to its shard
+                self._merge(self._retired, shard)
+        self._shards = live
+
+    def collect(self):
+        """Sum all shards into {label values: series}"""
+        with self._lock:
+            self._retire_dead_shards()
+            totals = {}
+            self._merge(totals, self._retired)
+            for _, shard in self._shards:
+                self._merge(totals, dict(shard))
+        return totals
+
+    @staticmethod
+    def _merge(into, shard):
+        for labelvalues, series in shard.items():
+            total = into.get(labelvalues)
+            if total is None:
+                into[labelvalues] = list(series)
+            else:
+                for i, value in enumerate(series):
+                    total[i] += value
+
+    def expose(self):
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} histogram']
+        for labelvalues, series in sorted(self.collect().items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float('inf'),), series):
+                cumulative += count
+                le = _format_labels(self.labelnames, labelvalues, f'le="{_format_number(bound)}"')
+                lines.append(f'{self.name}_bucket{le} {cumulative}')
+            labels = _format_labels(self.labelnames, labelvalues)
+            lines.append(f'{self.name}_sum{labels} {_format_number(series[-1])}')
+            lines.append(f'{self.name}_count{labels} {cumulative}')
+        return lines
+
+
+class Gauge:
+    """Gauge whose value is read from a callback at scrape time"""
+
+    def __init__(self, name, documentation, read):
+        self.name = name
+        self.documentation = documentation
+        self.read = read
+
+    def expose(self):
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} gauge']
+        try:
+            lines.append(f'{self.name} {_format_number(self.read())}')
+        except Exception as e:
+            print(f"Metric {self.name} unavailable: {e}")
+        return lines
+
+
+class Registry:
+    """The metrics exposed by /metrics"""
+
+    def __init__(self):
+        self._metrics = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def expose(self):
+        """All metrics in the Prometheus text exposition format"""
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.expose())
+        return '\n'.join(lines) + '\n'
+
+
+registry = Registry()
+
+REQUEST_SECONDS = registry.register(Histogram(
+    'mindease_http_request_duration_seconds',
+    'Time to produce a response, by route; _count is the request count.',
+    ('method', 'route', 'status')
+))
+
+STAGE_SECONDS = registry.register(Histogram(
+    'mindease_stage_duration_seconds',
+    'Time spent in symptom detection, prediction and scoring stages.',
+    ('stage',)
+))
+
+
+def timed(stage):
+    """Decorator recording a function's duration under STAGE_SECONDS{stage}
+
+    Returns the function unchanged when metrics are disabled.
+    """
+    if not config.METRICS_ENABLED:
+        return lambda function: function
+    return STAGE_SECONDS.time(stage)
@@ -1,32 +1,115 @@
 """
 Mental Health ML Model - Uses trained model on mental health dataset
 """
-import pandas as pd
+import itertools
 import os
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
 import re
+import threading
+import config
+from metrics import timed
+from result_cache import MISSING, ResultCache, normalize_text
+import server_timing
+from synonyms import SynonymExpander
+
+WORD_PATTERN = re.compile(r'\w+')
+
+# Every fit or artifact load gets a new version; cached results are keyed on it
+_versions = itertools.count(1)
+
+# pandas, numpy, scikit-learn and the artifact loader are imported on first
+# use so that importing this module (and the API) stays cheap
 
 
 class MentalHealthModel:
     """ML Model for mental health condition prediction"""
     
-    def __init__(self):
-        self.data_path = os.path.join(os.path.dirname(__file__), 'data', 'mental_health_dataset.csv')
+    VECTORIZER_PARAMS = {'ngram_range': [1, 3], 'max_features': 5000, 'stop_words': 'english'}
+    
+    def __init__(self, data_path=None, artifact_dir=None, use_artifact=True):
+        self.data_path = data_path or os.path.join(os.path.dirname(__file__), 'data', 'mental_health_dataset.csv')
+        self.artifact_dir = artifact_dir or config.MODEL_ARTIFACT_DIR
+        self.artifact_key = None
+        self.version = 0
+        self.term_state_key = None
+        self.prediction_cache = ResultCache(config.PREDICTION_CACHE_SIZE, config.PREDICTION_CACHE_MAX_CHARS)
         self.conditions_data = None
-        self.vectorizer = TfidfVectorizer(ngram_range=(1, 3), max_features=5000, stop_words='english')
+        self.vectorizer = self._new_vectorizer()
+        self._preprocess_vectorizer = self.vectorizer.build_preprocessor()
+        self._tokenize = self.vectorizer.build_tokenizer()
         self.condition_vectors = None
-        self._load_and_train()
+        self.term_postings = None
+        self.symptom_token_ids = {}
+        self.condition_phrases = []
+        self.synonyms = self._load_synonyms()
+        self._load_and_train(use_artifact)
     
-    def _load_and_train(self):
-        """Load dataset and train the model"""
+    def _new_vectorizer(self):
+        """Create an unfitted vectorizer with the model's settings"""
+        from sklearn.feature_extraction.text import TfidfVectorizer
+        
+        params = dict(self.VECTORIZER_PARAMS, ngram_range=tuple(self.VECTORIZER_PARAMS['ngram_range']))
+        return TfidfVectorizer(**params)
+    
+    def _load_and_train(self, use_artifact=True):
+        """Load the prebuilt artifact for the dataset, or load the dataset and train"""
+        import model_artifact
+        
         try:
-            self.conditions_data = pd.read_csv(self.data_path)
-            print(f"Loaded mental health dataset with {len(self.conditions_data)} conditions")
-            self._train_model()
+            self.artifact_key = model_artifact.artifact_key(self.data_path, self.VECTORIZER_PARAMS)
         except FileNotFoundError:
             print(f"Dataset not found. Using default conditions.")
             self._use_default_conditions()
+            return
+        
+        if use_artifact:
+            artifact = model_artifact.load(self.artifact_dir, self.artifact_key)
+            if artifact is not None:
+                self._apply_artifact(artifact)
+                print(f"Loaded model artifact {self.artifact_key} with {len(self.conditions_data)} conditions")
+                return
+        
+        import pandas as pd
+        
+        dataset = pd.read_csv(self.data_path)
+        self.conditions_data = dataset[['condition', 'symptoms']].to_dict('records')
+        print(f"Loaded mental health dataset with {len(self.conditions_data)} conditions")
+        self._train_model()
+        
+        if use_artifact:
+            try:
+                self.save_artifact()
+            except OSError as e:
+                print(f"Could not write model artifact: {e}")
+    
+    def save_artifact(self):
+        """Write the fitted model to its artifact directory, returning the path"""
+        import model_artifact
+        
+        vocabulary = [None] * len(self.vectorizer.vocabulary_)
+        for term, index in self.vectorizer.vocabulary_.items():
+            vocabulary[index] = term
+        return model_artifact.save(
+            self.artifact_dir,
+            self.artifact_key,
+            self.VECTORIZER_PARAMS,
+            self.conditions_data,
+            vocabulary,
+            self.vectorizer.idf_,
+            self.condition_vectors,
+            self.term_postings
+        )
+    
+    def _apply_artifact(self, artifact):
+        """Restore the fitted vectorizer and condition vectors from an artifact"""
+        import numpy as np
+        
+        self.conditions_data = artifact['conditions']
+        self.vectorizer.vocabulary_ = {term: index for index, term in enumerate(artifact['vocabulary'])}
+        self.vectorizer.idf_ = np.asarray(artifact['idf'])
+        self.condition_vectors = artifact['matrix']
+        self.term_postings = artifact['postings']
+        self._build_symptom_index()
+        self._new_version()
     
     def _use_default_conditions(self):
         """Use default conditions if dataset is not available"""
@@ -45,69 +128,336 @@ class MentalHealthModel:
                 'difficulty falling asleep, frequent waking, daytime tiredness, irritability, poor concentration, sleep anxiety, restless thoughts'
             ]
         }
-        self.conditions_data = pd.DataFrame(default_data)
+        self.conditions_data = [
+            {'condition': condition, 'symptoms': symptoms}
+            for condition, symptoms in zip(default_data['condition'], default_data['symptoms'])
+        ]
         self._train_model()
     
     def _train_model(self):
         """Train TF-IDF vectorizer on symptoms"""
         if self.conditions_data is None:
             return
-        all_symptoms = self.conditions_data['symptoms'].tolist()
+        all_symptoms = [row['symptoms'] for row in self.conditions_data]
         self.condition_vectors = self.vectorizer.fit_transform(all_symptoms)
+        self._build_index()
+        self._build_symptom_index()
+        self._new_version()
+    
+    def _new_version(self):
+        """Give the freshly fitted model a new version, dropping cached results"""
+        self.version = next(_versions)
+        # Unlike the version, the same in every process that loaded the same
+        # dataset and thesaurus, so stored term states can be checked with it
+        self.term_state_key = f"{self.artifact_key or 'default'}:{self.synonyms.key}"
+        self.prediction_cache.clear()
+    
+    def _build_index(self):
+        """Build the term -> condition posting lists
+        
+        The condition matrix in CSC form is exactly an inverted index: column
+        j lists the conditions containing term j and their TF-IDF weights.
+        """
+        self.term_postings = self.condition_vectors.tocsc()
+        self.term_postings.sort_indices()
     
+    def _build_symptom_index(self):
+        """Tokenize every condition's symptom phrases once
+        
+        symptom_token_ids maps each word seen in any symptom phrase to an id;
+        condition_phrases[i] holds (phrase, frozenset of token ids) for every
+        phrase of condition i, in dataset order.
+        """
+        token_ids = {}
+        condition_phrases = []
+        for row in self.conditions_data:
+            phrases = []
+            for phrase in row['symptoms'].split(','):
+                phrase = phrase.strip()
+                ids = frozenset(
+                    token_ids.setdefault(token, len(token_ids))
+                    for token in WORD_PATTERN.findall(phrase.lower())
+                )
+                phrases.append((phrase, ids))
+            condition_phrases.append(tuple(phrases))
+        self.symptom_token_ids = token_ids
+        self.condition_phrases = condition_phrases
+    
+    @timed('predict_conditions')
     def predict_conditions(self, user_text: str, top_k: int = 5) -> list:
-        """Predict mental health conditions based on user input text"""
+        """Predict mental health conditions based on user input text
+        
+        Results for texts up to the cache's length limit are cached on the
+        normalized text and the model version; callers get their own copy
+        of a cached result.
+        """
+        text = normalize_text(user_text)
+        if not self.prediction_cache.admits(text):
+            return self._predict_conditions(text, top_k)
+        key = (text, top_k, self.version)
+        results = self.prediction_cache.get(key)
+        if results is MISSING:
+            results = self._predict_conditions(text, top_k)
+            self.prediction_cache.put(key, results)
+        return _copy_results(results)
+    
+    def _predict_conditions(self, user_text: str, top_k: int) -> list:
+        """Score one text against the conditions
+        
+        Scores are accumulated only over conditions that share a term with
+        the text, using the posting lists of the text's terms, and the top-k
+        are picked with a partial sort. Both vectors are L2-normalized, so
+        the accumulated dot product is the cosine similarity.
+        """
         if self.condition_vectors is None:
             return []
         
-        processed_text = self._preprocess_text(user_text)
-        user_vector = self.vectorizer.transform([processed_text])
-        similarities = cosine_similarity(user_vector, self.condition_vectors).flatten()
-        top_indices = similarities.argsort()[-top_k:][::-1]
+        with server_timing.stage('vectorize'):
+            processed_text = self._preprocess_text(user_text)
+            user_vector = self.vectorizer.transform([processed_text])
+        with server_timing.stage('score'):
+            candidates, scores = self._score_candidates(user_vector.indices, user_vector.data)
+            return self._rank(self._user_token_ids(user_text), candidates, scores, top_k)
+    
+    def _rank(self, user_token_ids, candidates, scores, top_k):
+        """Partially sort scored candidates and build the top-k results"""
+        import numpy as np
+        
+        if len(scores) > top_k:
+            top = np.argpartition(scores, -top_k)[-top_k:]
+            candidates, scores = candidates[top], scores[top]
+        order = np.argsort(scores)[::-1]
+        return self._build_results(user_token_ids, candidates[order], scores[order])
+    
+    def _score_candidates(self, terms, weights):
+        """Accumulate term weight x posting weight per candidate condition"""
+        import numpy as np
+        
+        postings = self.term_postings
+        starts = postings.indptr[terms]
+        ends = postings.indptr[terms + 1]
+        if not len(terms) or not (ends - starts).any():
+            return np.empty(0, dtype=np.int64), np.empty(0)
+        
+        condition_ids = np.concatenate([postings.indices[s:e] for s, e in zip(starts, ends)])
+        contributions = np.concatenate([
+            postings.data[s:e] * weight for s, e, weight in zip(starts, ends, weights)
+        ])
+        candidates, inverse = np.unique(condition_ids, return_inverse=True)
+        return candidates, np.bincount(inverse, weights=contributions)
+    
+    @timed('predict_conditions_batch')
+    def predict_conditions_batch(self, user_texts: list, top_k: int = 5) -> list:
+        """Predict conditions for many texts at once
+        
+        Texts with a cached result are served from the cache. The remaining
+        distinct texts are vectorized in one transform call and scored against
+        every condition with a single sparse matrix product. Rows are already
+        L2-normalized, so the product is the cosine similarity.
+        """
+        if self.condition_vectors is None or not user_texts:
+            return [[] for _ in user_texts]
+        
+        texts = [normalize_text(text) for text in user_texts]
+        cache = self.prediction_cache
+        cacheable = {text: cache.admits(text) for text in dict.fromkeys(texts)}
+        cached = [cache.get((text, top_k, self.version)) if cacheable[text] else MISSING for text in texts]
+        misses = list(dict.fromkeys(text for text, results in zip(texts, cached) if results is MISSING))
+        if misses:
+            computed = dict(zip(misses, self._predict_conditions_batch(misses, top_k)))
+            for text, results in computed.items():
+                if cacheable[text]:
+                    cache.put((text, top_k, self.version), results)
+            cached = [computed[text] if results is MISSING else results
+                      for text, results in zip(texts, cached)]
+        return [_copy_results(results) for results in cached]
+    
+    def _predict_conditions_batch(self, user_texts: list, top_k: int) -> list:
+        """Score many texts with one sparse matrix product"""
+        import numpy as np
+        
+        user_vectors = self.vectorizer.transform([self._preprocess_text(text) for text in user_texts])
+        scores = (user_vectors @ self.condition_vectors.T).tocsr()
         
+        batch_results = []
+        for row, user_text in enumerate(user_texts):
+            start, end = scores.indptr[row], scores.indptr[row + 1]
+            row_scores = scores.data[start:end]
+            row_indices = scores.indices[start:end]
+            if len(row_scores) > top_k:
+                top = np.argpartition(row_scores, -top_k)[-top_k:]
+                row_scores, row_indices = row_scores[top], row_indices[top]
+            order = np.argsort(row_scores)[::-1]
+            batch_results.append(
+                self._build_results(self._user_token_ids(user_text), row_indices[order], row_scores[order])
+            )
+        return batch_results
+    
+    def _build_results(self, user_token_ids: set, indices, scores) -> list:
+        """Turn ranked condition indices and similarity scores into result dicts"""
         results = []
-        for idx in top_indices:
-            if similarities[idx] > 0.01:
-                condition = self.conditions_data.iloc[idx]
-                matched_symptoms = self._get_matched_symptoms(user_text.lower(), condition['symptoms'])
+        for idx, score in zip(indices, scores):
+            if score > 0.01:
+                condition = self.conditions_data[idx]
+                matched_symptoms = self._get_matched_symptoms(user_token_ids, idx)
                 results.append({
                     'condition': condition['condition'],
-                    'confidence': round(float(similarities[idx]) * 100, 2),
+                    'confidence': round(float(score) * 100, 2),
                     'matched_symptoms': matched_symptoms,
-                    'severity': self._calculate_severity(similarities[idx], len(matched_symptoms))
+                    'severity': self._calculate_severity(score, len(matched_symptoms))
                 })
         return results
     
+    def new_term_state(self) -> dict:
+        """Create an empty running term state for a conversation
+        
+        The state holds everything predict_from_term_state needs, so a
+        conversation can be analyzed without re-reading its transcript:
+        in-vocabulary n-gram counts of the user text, the last tokens and
+        characters of that text (for n-grams and synonym terms that span two
+        messages), the triggered synonym entries and the symptom words seen.
+        It only holds strings and numbers so it can be stored in a session.
+        """
+        return {
+            'model_key': self.term_state_key,
+            'counts': {},
+            'tail_tokens': [],
+            'tail_text': '',
+            'synonyms': [],
+            'symptom_tokens': []
+        }
+    
+    def is_current(self, term_state) -> bool:
+        """Return True if a term state was built against this model's dataset and thesaurus
+        
+        Sessions can be shared between worker processes, each with its own
+        version counter, so states are keyed on the artifact key (a hash of
+        the dataset) and the thesaurus instead.
+        """
+        return term_state is not None and term_state.get('model_key') == self.term_state_key
+    
+    @server_timing.timed('vectorize')
+    def add_to_term_state(self, term_state: dict, message: str):
+        """Fold one user message into a running term state
+        
+        The result is the same as if the message had been appended to the
+        text the state was built from.
+        """
+        text = normalize_text(message)
+        if not text:
+            return
+        
+        # Scan the new text with enough of the previous text in front of it
+        # to catch synonym terms spanning both. The tail is cut to one more
+        # character than the longest term, so a match at its very start lies
+        # within the previous text (already scanned) or begins mid-word.
+        matcher = self.synonyms.matcher
+        previous = term_state['tail_text']
+        window = previous + ' ' + text if previous else text
+        truncated = len(previous) > matcher.max_length
+        triggered = set(term_state['synonyms'])
+        for entry, start, _ in matcher.finditer(window):
+            if start or not truncated:
+                triggered.add(entry)
+        term_state['synonyms'] = sorted(triggered)
+        term_state['tail_text'] = window[-(matcher.max_length + 1):]
+        
+        term_state['tail_tokens'] = self._count_new_ngrams(
+            term_state['counts'], term_state['tail_tokens'], self._term_tokens(text)
+        )
+        
+        token_ids = self.symptom_token_ids
+        symptom_tokens = set(term_state['symptom_tokens'])
+        symptom_tokens.update(token for token in WORD_PATTERN.findall(text) if token in token_ids)
+        term_state['symptom_tokens'] = sorted(symptom_tokens)
+    
+    def predict_from_term_state(self, term_state: dict, top_k: int = 5) -> list:
+        """Predict conditions for the text folded into a term state
+        
+        Only the synonym expansions are tokenized here; the term counts are
+        reweighted by IDF, L2-normalized and scored through the posting
+        lists, so the cost does not depend on the length of the text.
+        """
+        if self.condition_vectors is None:
+            return []
+        
+        import numpy as np
+        
+        with server_timing.stage('vectorize'):
+            counts = dict(term_state['counts'])
+            expansions = self.synonyms.expansions
+            expansion_tokens = [
+                token for entry in term_state['synonyms'] if 0 <= entry < len(expansions)
+                for token in self._term_tokens(expansions[entry])
+            ]
+            self._count_new_ngrams(counts, term_state['tail_tokens'], expansion_tokens)
+            
+            vocabulary = self.vectorizer.vocabulary_
+            # Terms outside the vocabulary carry no weight; skip rather than fail on them
+            term_counts = sorted(
+                (vocabulary[term], count) for term, count in counts.items() if term in vocabulary
+            )
+            terms = np.array([term for term, _ in term_counts], dtype=np.int64)
+            weights = np.array([count for _, count in term_counts], dtype=np.float64)
+            weights *= self.vectorizer.idf_[terms]
+            norm = np.sqrt(weights @ weights)
+            if norm:
+                weights /= norm
+        
+        with server_timing.stage('score'):
+            candidates, scores = self._score_candidates(terms, weights)
+            token_ids = self.symptom_token_ids
+            user_token_ids = {token_ids[token] for token in term_state['symptom_tokens'] if token in token_ids}
+            return self._rank(user_token_ids, candidates, scores, top_k)
+    
+    def _term_tokens(self, text: str) -> list:
+        """Tokenize text the way the vectorizer does, dropping stop words"""
+        stop_words = self.vectorizer.get_stop_words() or ()
+        return [
+            token for token in self._tokenize(self._preprocess_vectorizer(text))
+            if token not in stop_words
+        ]
+    
+    def _count_new_ngrams(self, counts: dict, context: list, tokens: list) -> list:
+        """Count the in-vocabulary n-grams of context + tokens that include a new token
+        
+        Returns the trailing tokens needed as context for the next call.
+        """
+        vocabulary = self.vectorizer.vocabulary_
+        min_n, max_n = self.vectorizer.ngram_range
+        sequence = context + tokens
+        for n in range(min_n, max_n + 1):
+            for i in range(max(len(context) - n + 1, 0), len(sequence) - n + 1):
+                term = ' '.join(sequence[i:i + n])
+                if term in vocabulary:
+                    counts[term] = counts.get(term, 0) + 1
+        return sequence[-(max_n - 1):] if max_n > 1 else []
+    
     def _preprocess_text(self, text: str) -> str:
         """Preprocess text for better matching"""
-        text = text.lower()
-        synonyms = {
-            'sad': 'sadness depression down unhappy',
-            'anxious': 'anxiety worry nervous worried',
-            'tired': 'fatigue exhausted low energy',
-            'scared': 'fear anxiety panic afraid',
-            'angry': 'irritability anger frustrated',
-            'nervous': 'anxiety worry restless',
-            'panic': 'panic attack anxiety fear',
-            'sleep': 'insomnia sleep difficulty sleeping',
-        }
-        enhanced_text = text
-        for word, syns in synonyms.items():
-            if word in text:
-                enhanced_text += ' ' + syns
-        return enhanced_text
-    
-    def _get_matched_symptoms(self, user_text: str, condition_symptoms: str) -> list:
-        """Find which symptoms from the condition match the user text"""
-        symptoms_list = [s.strip() for s in condition_symptoms.split(',')]
-        matched = []
-        user_words = set(re.findall(r'\b\w+\b', user_text.lower()))
-        
-        for symptom in symptoms_list:
-            symptom_words = set(re.findall(r'\b\w+\b', symptom.lower()))
-            if symptom_words & user_words:
-                matched.append(symptom.strip())
-        return matched
+        return self.synonyms.expand(text.lower())
+    
+    def _load_synonyms(self):
+        """Load the synonym thesaurus used to expand user text"""
+        try:
+            return SynonymExpander.from_file(
+                config.SYNONYMS_PATH, config.SYNONYM_CACHE_SIZE, config.PREDICTION_CACHE_MAX_CHARS
+            )
+        except FileNotFoundError:
+            print(f"Synonyms file not found. Skipping synonym expansion.")
+            return SynonymExpander([])
+    
+    def _user_token_ids(self, user_text: str) -> set:
+        """Tokenize user text once into the ids of known symptom words"""
+        token_ids = self.symptom_token_ids
+        return {token_ids[token] for token in WORD_PATTERN.findall(user_text.lower()) if token in token_ids}
+    
+    def _get_matched_symptoms(self, user_token_ids: set, condition_idx: int) -> list:
+        """Find which symptoms from the condition share a word with the user text"""
+        return [
+            phrase for phrase, phrase_ids in self.condition_phrases[condition_idx]
+            if not phrase_ids.isdisjoint(user_token_ids)
+        ]
     
     def _calculate_severity(self, confidence: float, matched_count: int) -> str:
         """Calculate severity based on confidence and matched symptoms"""
@@ -124,17 +474,15 @@ class MentalHealthModel:
         """Get detailed information about a specific condition"""
         if self.conditions_data is None:
             return None
-        condition_row = self.conditions_data[
-            self.conditions_data['condition'].str.lower() == condition_name.lower()
-        ]
-        if condition_row.empty:
-            return None
-        condition = condition_row.iloc[0]
-        return {
-            'name': condition['condition'],
-            'symptoms': condition['symptoms'].split(', '),
-            'description': self._get_condition_description(condition['condition'])
-        }
+        condition_name = condition_name.lower()
+        for condition in self.conditions_data:
+            if condition['condition'].lower() == condition_name:
+                return {
+                    'name': condition['condition'],
+                    'symptoms': condition['symptoms'].split(', '),
+                    'description': self._get_condition_description(condition['condition'])
+                }
+        return None
     
     def _get_condition_description(self, condition_name: str) -> str:
         """Get description for a condition"""
@@ -156,16 +504,135 @@ class MentalHealthModel:
             return []
         return [
             {'name': row['condition'], 'description': self._get_condition_description(row['condition'])}
-            for _, row in self.conditions_data.iterrows()
+            for row in self.conditions_data
         ]
 
 
-# Singleton instance
+def _copy_results(results):
+    """Copy a result list so callers cannot modify a cached one"""
+    return [dict(result, matched_symptoms=list(result['matched_symptoms'])) for result in results]
+
+
+# Singleton instance, replaced wholesale when the dataset changes (see
+# ModelReloader). Callers should fetch it once per request and keep using
+# that instance, so a request never mixes two models.
 _model_instance = None
+_model_lock = threading.Lock()
 
 def get_model():
     """Get or create the ML model singleton"""
     global _model_instance
     if _model_instance is None:
-        _model_instance = MentalHealthModel()
+        with _model_lock:
+            if _model_instance is None:
+                _model_instance = MentalHealthModel()
     return _model_instance
+
+
+def _reset_model_lock_after_fork():
+    # A thread loading the model at fork time does not exist in the child,
+    # so the lock it held would never be released. _model_instance is only
+    # bound to a fully built model, so a load in progress simply restarts.
+    global _model_lock
+    _model_lock = threading.Lock()
+
+
+os.register_at_fork(after_in_child=_reset_model_lock_after_fork)
+
+
+def get_loaded_model():
+    """Return the model singleton if it has been loaded, without loading it"""
+    return _model_instance
+
+
+class ModelReloader:
+    """Polls the dataset file and swaps in a retrained model when it changes
+    
+    The file's mtime and size are checked every interval; when they change
+    the dataset is hashed, and only a different hash triggers a rebuild.
+    The new model is built entirely on the polling thread and then published
+    with a single assignment, so requests keep using the old model until
+    the swap and never wait for the retrain.
+    """
+    
+    def __init__(self, interval):
+        self.interval = interval
+        self.reloads = 0
+        self.last_error = None
+        self._fingerprint = object()  # matches nothing, so the first poll hashes
+        self._thread = None
+        self._stop = threading.Event()
+    
+    def start(self):
+        """Start polling from a daemon thread, unless already started"""
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='model-reloader', daemon=True)
+        self._thread.start()
+    
+    def stop(self):
+        """Stop the polling thread"""
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+    
+    def restart_after_fork(self):
+        """Start a fresh polling thread in a forked child; threads do not survive fork"""
+        self._thread = None
+        self._stop = threading.Event()
+        self.start()
+    
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.check()
+    
+    def check(self):
+        """Poll the dataset once, returning True if a new model was swapped in"""
+        global _model_instance
+        import model_artifact
+        
+        model = _model_instance
+        if model is None:
+            # Not loaded yet; the first load reads the current file
+            return False
+        
+        fingerprint = self._stat(model.data_path)
+        if fingerprint == self._fingerprint:
+            return False
+        self._fingerprint = fingerprint
+        
+        try:
+            key = model_artifact.artifact_key(model.data_path, model.VECTORIZER_PARAMS)
+        except FileNotFoundError:
+            key = None
+        if key == model.artifact_key:
+            return False
+        
+        try:
+            new_model = MentalHealthModel(data_path=model.data_path, artifact_dir=model.artifact_dir)
+        except Exception as e:
+            # Keep serving the old model; the next change to the file retries
+            self.last_error = str(e)
+            print(f"Model reload failed: {e}")
+            return False
+        
+        _model_instance = new_model
+        self.reloads += 1
+        self.last_error = None
+        print(f"Reloaded model: version {new_model.version}, artifact {new_model.artifact_key}")
+        return True
+    
+    @staticmethod
+    def _stat(path):
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+    
+    def stats(self):
+        """Reload counters for monitoring"""
+        return {'interval': self.interval, 'reloads': self.reloads, 'last_error': self.last_error}
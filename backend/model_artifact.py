@@ -0,0 +1,151 @@
+"""
+Model Artifact - Versioned, memory-mappable snapshot of a fitted MentalHealthModel
+
+An artifact is a directory named after a key derived from the dataset
+contents and the vectorizer settings:
+
+    <artifact_dir>/model-v<FORMAT_VERSION>-<key>/
+        header.json     format version, key, vectorizer params, vocabulary, conditions
+        idf.npy         IDF weights, one per vocabulary term
+        data.npy        CSR condition matrix: values
+        indices.npy     CSR condition matrix: column indices
+        indptr.npy      CSR condition matrix: row pointers
+        postings_*.npy  the same matrix in CSC form: the term -> condition
+                        posting lists used for candidate retrieval
+
+The arrays are plain .npy files so they can be memory-mapped on load.
+
+Build one ahead of deployment with:
+    python model_artifact.py [--dataset PATH] [--output DIR]
+"""
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+
+import numpy as np
+
+FORMAT_VERSION = 2
+ARRAYS = ('idf', 'data', 'indices', 'indptr', 'postings_data', 'postings_indices', 'postings_indptr')
+
+
+def artifact_key(data_path, params):
+    """Hash of the dataset bytes, the vectorizer params and the format version"""
+    digest = hashlib.sha256()
+    with open(data_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    digest.update(json.dumps(params, sort_keys=True).encode('utf-8'))
+    digest.update(str(FORMAT_VERSION).encode('ascii'))
+    return digest.hexdigest()[:16]
+
+
+def artifact_path(artifact_dir, key):
+    """Directory holding the artifact for a key"""
+    return os.path.join(artifact_dir, f'model-v{FORMAT_VERSION}-{key}')
+
+
+def save(artifact_dir, key, params, conditions, vocabulary, idf, matrix, postings):
+    """Write an artifact, returning its path
+
+    The files are written to a temporary directory that is renamed into
+    place, so concurrent builders and readers never see a partial artifact.
+    """
+    final_path = artifact_path(artifact_dir, key)
+    if os.path.isdir(final_path):
+        return final_path
+
+    os.makedirs(artifact_dir, exist_ok=True)
+    tmp_path = tempfile.mkdtemp(prefix='.building-', dir=artifact_dir)
+    try:
+        header = {
+            'format_version': FORMAT_VERSION,
+            'key': key,
+            'params': params,
+            'shape': list(matrix.shape),
+            'vocabulary': vocabulary,
+            'conditions': conditions
+        }
+        with open(os.path.join(tmp_path, 'header.json'), 'w', encoding='utf-8') as f:
+            json.dump(header, f, ensure_ascii=False)
+
+        arrays = {
+            'idf': np.asarray(idf, dtype=np.float64),
+            'data': np.asarray(matrix.data, dtype=np.float64),
+            'indices': np.asarray(matrix.indices, dtype=np.int32),
+            'indptr': np.asarray(matrix.indptr, dtype=np.int32),
+            'postings_data': np.asarray(postings.data, dtype=np.float64),
+            'postings_indices': np.asarray(postings.indices, dtype=np.int32),
+            'postings_indptr': np.asarray(postings.indptr, dtype=np.int32)
+        }
+        for name in ARRAYS:
+            np.save(os.path.join(tmp_path, f'{name}.npy'), arrays[name])
+
+        # mkdtemp creates the directory 0700; servers may run as another user
+        os.chmod(tmp_path, 0o755)
+        os.rename(tmp_path, final_path)
+    except OSError:
+        shutil.rmtree(tmp_path, ignore_errors=True)
+        if not os.path.isdir(final_path):
+            raise
+    return final_path
+
+
+def load(artifact_dir, key):
+    """Memory-map the artifact for a key, or return None if there is none"""
+    path = artifact_path(artifact_dir, key)
+    header_file = os.path.join(path, 'header.json')
+    if not os.path.isfile(header_file):
+        return None
+
+    with open(header_file, encoding='utf-8') as f:
+        header = json.load(f)
+    if header.get('format_version') != FORMAT_VERSION or header.get('key') != key:
+        return None
+
+    from scipy.sparse import csc_matrix, csr_matrix
+
+    arrays = {
+        name: np.load(os.path.join(path, f'{name}.npy'), mmap_mode='r')
+        for name in ARRAYS
+    }
+    matrix = csr_matrix(
+        (arrays['data'], arrays['indices'], arrays['indptr']),
+        shape=tuple(header['shape']),
+        copy=False
+    )
+    postings = csc_matrix(
+        (arrays['postings_data'], arrays['postings_indices'], arrays['postings_indptr']),
+        shape=tuple(header['shape']),
+        copy=False
+    )
+    return {
+        'key': key,
+        'params': header['params'],
+        'vocabulary': header['vocabulary'],
+        'conditions': header['conditions'],
+        'idf': arrays['idf'],
+        'matrix': matrix,
+        'postings': postings
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Build the MentalHealthModel artifact')
+    parser.add_argument('--dataset', help='conditions CSV (default: the bundled dataset)')
+    parser.add_argument('--output', help='artifact directory (default: MODEL_ARTIFACT_DIR)')
+    args = parser.parse_args()
+
+    from ml_model import MentalHealthModel
+
+    model = MentalHealthModel(data_path=args.dataset, artifact_dir=args.output, use_artifact=False)
+    if model.artifact_key is None:
+        raise SystemExit(f"Dataset not found: {model.data_path}")
+    path = model.save_artifact()
+    print(f"Wrote model artifact {path}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,106 @@
+"""
+Phrase Matcher - Single-pass, word-boundary matching of many literal phrases
+"""
+import re
+
+
+class PhraseMatcher:
+    """Finds every occurrence of a fixed set of labelled phrases in one scan
+
+    All phrases are compiled into a single trie-shaped regular expression that
+    is tried once at every word boundary of the text. The longest phrase at a
+    position wins the regex match; shorter phrases that are word-bounded
+    prefixes of it are resolved from a table built at construction time, so
+    overlapping phrases from different labels are all reported.
+    """
+
+    def __init__(self, groups):
+        """Build the matcher from a mapping of label -> iterable of phrases"""
+        self.labels = list(groups)
+        self._label_order = {label: i for i, label in enumerate(self.labels)}
+
+        phrase_labels = {}
+        for label, phrases in groups.items():
+            for phrase in phrases:
+                phrase = phrase.lower().strip()
+                if not phrase:
+                    continue
+                phrase_labels.setdefault(phrase, [])
+                if label not in phrase_labels[phrase]:
+                    phrase_labels[phrase].append(label)
+
+        self.max_length = max(map(len, phrase_labels), default=0)
+        trie = self._build_trie(phrase_labels)
+        self._hits = self._build_hits(phrase_labels, trie)
+        self._regex = re.compile(r'\b(?=(' + self._to_regex(trie) + r')\b)') if trie else None
+
+    @staticmethod
+    def _build_trie(phrase_labels):
+        """Build a character trie; the '' key marks the end of a phrase"""
+        trie = {}
+        for phrase in phrase_labels:
+            node = trie
+            for char in phrase:
+                node = node.setdefault(char, {})
+            node[''] = phrase
+        return trie
+
+    @staticmethod
+    def _build_hits(phrase_labels, trie):
+        """Map each phrase to (label, length) for itself and its word-bounded prefixes"""
+        hits = {}
+        for phrase in phrase_labels:
+            entries = []
+            node = trie
+            for end, char in enumerate(phrase, 1):
+                node = node[char]
+                prefix = node.get('')
+                if prefix is None:
+                    continue
+                if end < len(phrase) and not PhraseMatcher._is_boundary(phrase, end):
+                    continue
+                entries.extend((label, end) for label in phrase_labels[prefix])
+            hits[phrase] = tuple(entries)
+        return hits
+
+    @staticmethod
+    def _is_boundary(text, index):
+        """Return True if there is a regex word boundary at text[index]"""
+        before = text[index - 1].isalnum() or text[index - 1] == '_'
+        after = text[index].isalnum() or text[index] == '_'
+        return before != after
+
+    @staticmethod
+    def _to_regex(node):
+        """Render a trie node as a longest-first regex fragment"""
+        branches = [re.escape(char) + PhraseMatcher._to_regex(child)
+                    for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ''
+        body = branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+        if '' in node:
+            # Prefer the longer continuation, fall back to ending here
+            return '(?:' + body + ')?'
+        return body
+
+    def finditer(self, text):
+        """Yield (label, start, end) for every phrase occurrence in text"""
+        if self._regex is None:
+            return
+        for match in self._regex.finditer(text):
+            start = match.start(1)
+            for label, length in self._hits[match.group(1)]:
+                yield label, start, start + length
+
+    def scan(self, text):
+        """Return {label: [(start, end), ...]} in label declaration order"""
+        found = {}
+        for label, start, end in self.finditer(text):
+            found.setdefault(label, []).append((start, end))
+        if len(found) > 1:
+            found = dict(sorted(found.items(), key=lambda item: self._label_order[item[0]]))
+        return found
+
+    def labels_in(self, text):
+        """Return the matched labels in declaration order"""
+        return list(self.scan(text))
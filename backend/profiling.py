@@ -0,0 +1,177 @@
+"""
+Profiling - Opt-in per-request profiles for finding slow stages
+
+A request is profiled when it carries the configured token in the
+X-MindEase-Profile header, or when it is picked at the configured sample
+rate. A token bucket caps profiles per minute either way, so sampling can
+stay on in production. Each profiled request writes two files to the
+profile directory:
+
+    <id>.prof     cProfile statistics, for pstats or snakeviz
+    <id>.folded   collapsed stacks sampled from the request thread, one
+                  "frame;frame;frame count" line per stack, for flamegraph.pl
+                  or speedscope
+"""
+import cProfile
+import hmac
+import os
+import random
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+
+import config
+
+PROFILE_HEADER = 'X-MindEase-Profile'
+
+
+class TokenBucket:
+    """Allows rate_per_minute events on average, with bursts up to burst"""
+
+    def __init__(self, rate_per_minute, burst=1, clock=time.monotonic):
+        self.rate = rate_per_minute / 60.0
+        self.burst = burst
+        self.clock = clock
+        self._tokens = float(burst)
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def allow(self):
+        with self._lock:
+            now = self.clock()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            if self._tokens < 1:
+                return False
+            self._tokens -= 1
+            return True
+
+
+class StackSampler:
+    """Samples one thread's Python stack from a daemon thread into collapsed-stack counts"""
+
+    def __init__(self, thread_id, interval):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='stack-sampler', daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                return
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f'{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})')
+                frame = frame.f_back
+            self.stacks[';'.join(reversed(stack))] += 1
+
+    def folded(self):
+        return ''.join(f'{stack} {count}\n' for stack, count in self.stacks.most_common())
+
+
+class RequestProfile:
+    """cProfile and a stack sampler running for one request on the current thread"""
+
+    def __init__(self, name, sample_interval):
+        self.name = name
+        self.profiler = cProfile.Profile()
+        self.sampler = StackSampler(threading.get_ident(), sample_interval)
+        self.started = time.perf_counter()
+
+    def start(self):
+        """Start profiling, returning False if another profiler is already active"""
+        try:
+            # Python 3.12+ allows one active profiler, so overlapping requests can fail here
+            self.profiler.enable()
+        except ValueError as e:
+            print(f"Could not start profiler: {e}")
+            return False
+        self.sampler.start()
+        return True
+
+    def stop(self):
+        self.profiler.disable()
+        self.sampler.stop()
+        return time.perf_counter() - self.started
+
+    def write(self, directory, elapsed):
+        """Write <id>.prof and <id>.folded, returning the id"""
+        profile_id = f"{datetime.now().strftime('%Y%m%d-%H%M%S-%f')}-{self.name}-{elapsed * 1e3:.0f}ms"
+        os.makedirs(directory, exist_ok=True)
+        base = os.path.join(directory, profile_id)
+        self.profiler.dump_stats(base + '.prof')
+        with open(base + '.folded', 'w', encoding='utf-8') as f:
+            f.write(self.sampler.folded())
+        return profile_id
+
+
+class RequestProfiler:
+    """Decides which requests to profile and writes their profiles"""
+
+    def __init__(self, directory, sample_rate=0.0, token='', max_per_minute=6,
+                 sample_interval=0.001):
+        self.directory = directory
+        self.sample_rate = sample_rate
+        self.token = token
+        self.sample_interval = sample_interval
+        self.limiter = TokenBucket(max_per_minute, burst=max(1, max_per_minute // 6))
+        self.written = 0
+
+    @property
+    def enabled(self):
+        return bool(self.token) or self.sample_rate > 0
+
+    def wants(self, header_value):
+        """Whether to profile a request with this profile header value (or None)"""
+        requested = bool(self.token) and header_value is not None and \
+            hmac.compare_digest(header_value.encode('utf-8'), self.token.encode('utf-8'))
+        if not requested and not (self.sample_rate > 0 and random.random() < self.sample_rate):
+            return False
+        return self.limiter.allow()
+
+    def start(self, method, route):
+        """Start profiling the current request, returning the profile or None"""
+        name = re.sub(r'[^A-Za-z0-9]+', '_', f'{method}{route}').strip('_')
+        profile = RequestProfile(name, self.sample_interval)
+        return profile if profile.start() else None
+
+    def finish(self, profile):
+        """Stop a profile and write it, returning its id (None if writing failed)"""
+        elapsed = profile.stop()
+        try:
+            profile_id = profile.write(self.directory, elapsed)
+        except OSError as e:
+            print(f"Could not write profile: {e}")
+            return None
+        self.written += 1
+        return profile_id
+
+    def stats(self):
+        return {
+            'enabled': self.enabled,
+            'sample_rate': self.sample_rate,
+            'profiles_written': self.written
+        }
+
+
+def from_config():
+    return RequestProfiler(
+        config.PROFILE_DIR,
+        sample_rate=config.PROFILE_SAMPLE_RATE,
+        token=config.PROFILE_TOKEN,
+        max_per_minute=config.PROFILE_MAX_PER_MINUTE
+    )
@@ -0,0 +1,117 @@
+"""
+Question Bank - Immutable, indexed questionnaire loaded from JSON
+"""
+import json
+import os
+import threading
+from types import MappingProxyType
+
+import config
+
+NO_PARENT = -1
+
+
+def _freeze(value):
+    """Recursively turn dicts and lists into read-only mappings and tuples"""
+    if isinstance(value, dict):
+        return MappingProxyType({key: _freeze(item) for key, item in value.items()})
+    if isinstance(value, list):
+        return tuple(_freeze(item) for item in value)
+    return value
+
+
+class QuestionBank:
+    """An ordered question bank with a precompiled dependency skip table
+
+    Questions are asked in order. A question with 'depends_on' (the id of an
+    earlier question) is skipped when that question was answered "No"; an
+    unanswered parent does not skip it. Dependencies are resolved to indices
+    at load time, and for every dependent question the table records where
+    the run of consecutive questions sharing its parent ends, so the
+    follow-ups of a "No" are passed over in one step however many there are.
+    """
+
+    def __init__(self, questions):
+        self.questions = tuple(_freeze(question) for question in questions)
+
+        index_of = {}
+        parents = []
+        for index, question in enumerate(self.questions):
+            question_id = question['id']
+            if question_id in index_of:
+                raise ValueError(f"Duplicate question id {question_id!r}")
+            parent = question.get('depends_on')
+            if parent is not None and parent not in index_of:
+                raise ValueError(f"Question {question_id!r} depends on {parent!r}, which is not an earlier question")
+            parents.append(NO_PARENT if parent is None else index_of[parent])
+            index_of[question_id] = index
+
+        self.index_of = MappingProxyType(index_of)
+        self.parents = tuple(parents)
+        self._skip_to = self._build_skip_table(self.parents)
+
+    @classmethod
+    def from_file(cls, path):
+        """Load a question bank from a JSON list of questions"""
+        with open(path, encoding='utf-8') as f:
+            return cls(json.load(f))
+
+    @staticmethod
+    def _build_skip_table(parents):
+        """Map each question to the first index past the run of questions sharing its parent"""
+        count = len(parents)
+        skip_to = [0] * count
+        for index in range(count - 1, -1, -1):
+            parent = parents[index]
+            if parent != NO_PARENT and index + 1 < count and parents[index + 1] == parent:
+                # A sibling follows; it is skipped along with this question
+                skip_to[index] = skip_to[index + 1]
+            else:
+                skip_to[index] = index + 1
+        return tuple(skip_to)
+
+    def __len__(self):
+        return len(self.questions)
+
+    def next_index(self, current_index, answers):
+        """Index of the next question to ask after current_index, or len(self) when done
+
+        answers maps str(question index) to the answer for every question
+        answered so far (string keys survive a JSON round trip).
+        """
+        index = current_index + 1
+        while index < len(self.questions):
+            parent = self.parents[index]
+            if parent == NO_PARENT or not self._skips_dependents(answers.get(str(parent))):
+                return index
+            index = self._skip_to[index]
+        return len(self.questions)
+
+    @staticmethod
+    def _skips_dependents(answer):
+        """An explicit "No"; unanswered questions do not skip their dependents"""
+        return answer is not None and str(answer).lower() == 'no'
+
+
+# The configured question bank, shared by the questionnaire handler and scorer
+_bank_instance = None
+_bank_lock = threading.Lock()
+
+
+def get_question_bank():
+    """Get or load the question bank at config.QUESTIONS_PATH"""
+    global _bank_instance
+    if _bank_instance is None:
+        with _bank_lock:
+            if _bank_instance is None:
+                _bank_instance = QuestionBank.from_file(config.QUESTIONS_PATH)
+    return _bank_instance
+
+
+def _reset_bank_lock_after_fork():
+    # The thread that held the lock at fork time does not exist in the child
+    global _bank_lock
+    _bank_lock = threading.Lock()
+
+
+os.register_at_fork(after_in_child=_reset_bank_lock_after_fork)
@@ -0,0 +1,139 @@
+"""
+Questionnaire Scoring - Vectorized scoring of questionnaire answers
+
+The weights file configures scoring:
+
+    answer_values         per question type, the number each answer encodes to
+    severity_thresholds   fractions of a condition's maximum score at which it
+                          becomes mild, moderate and severe
+    condition_thresholds  per-condition overrides of severity_thresholds
+    weights               per question id, the weight of its encoded answer
+                          towards each condition
+"""
+import json
+import os
+import threading
+
+import numpy as np
+
+import config
+from metrics import timed
+from question_bank import get_question_bank
+
+SEVERITY_LEVELS = ('Minimal', 'Mild', 'Moderate', 'Severe')
+
+
+def answers_from_responses(responses):
+    """Map str(question index) -> answer from a session's response list (last answer wins)"""
+    return {str(response['question_index']): response.get('answer') for response in responses}
+
+
+class QuestionnaireScorer:
+    """Scores questionnaire answers with a question x condition weight matrix
+
+    A questionnaire is encoded as a vector with one number per question
+    (unanswered and unrecognised answers are 0), and a batch as a matrix
+    with one row per questionnaire. Condition scores are the product with
+    the weight matrix, and severities compare every score, as a fraction of
+    the condition's maximum, against the thresholds in one operation.
+    """
+
+    def __init__(self, bank, scoring):
+        self.bank = bank
+        self._answer_values = {
+            question_type: {answer.strip().lower(): value for answer, value in values.items()}
+            for question_type, values in scoring['answer_values'].items()
+        }
+        self._encoders = tuple(self._answer_values.get(question['type']) for question in bank.questions)
+
+        index_by_id = {str(question_id): index for question_id, index in bank.index_of.items()}
+        unknown = set(scoring['weights']) - set(index_by_id)
+        if unknown:
+            raise ValueError(f"Weights given for unknown questions: {sorted(unknown)}")
+
+        self.conditions = tuple(dict.fromkeys(
+            condition for weights in scoring['weights'].values() for condition in weights
+        ))
+        column = {condition: i for i, condition in enumerate(self.conditions)}
+        self.weights = np.zeros((len(bank), len(self.conditions)))
+        for question_id, weights in scoring['weights'].items():
+            for condition, weight in weights.items():
+                self.weights[index_by_id[question_id], column[condition]] = weight
+
+        max_values = np.array([max(encoder.values()) if encoder else 0.0 for encoder in self._encoders])
+        self.max_scores = max_values @ np.clip(self.weights, 0, None)
+
+        default = scoring['severity_thresholds']
+        overrides = scoring.get('condition_thresholds', {})
+        self.thresholds = np.array([
+            [overrides.get(condition, default)[level] for level in ('mild', 'moderate', 'severe')]
+            for condition in self.conditions
+        ])
+        self.critical = np.array([bool(question.get('critical')) for question in bank.questions])
+
+    @classmethod
+    def from_file(cls, bank, path):
+        """Build a scorer for a question bank from a JSON weights file"""
+        with open(path, encoding='utf-8') as f:
+            return cls(bank, json.load(f))
+
+    def encode(self, answers, out=None):
+        """Encode a mapping of str(question index) -> answer as a vector"""
+        vector = np.zeros(len(self.bank)) if out is None else out
+        for key, answer in answers.items():
+            index = int(key)
+            if not 0 <= index < len(vector) or answer is None:
+                continue
+            encoder = self._encoders[index]
+            if encoder is not None:
+                vector[index] = encoder.get(str(answer).strip().lower(), 0.0)
+        return vector
+
+    def encode_batch(self, answer_sets):
+        """Encode many answer mappings as a matrix with one row each"""
+        matrix = np.zeros((len(answer_sets), len(self.bank)))
+        for row, answers in zip(matrix, answer_sets):
+            self.encode(answers, out=row)
+        return matrix
+
+    @timed('questionnaire_scoring')
+    def score(self, encoded):
+        """Score one encoded vector or a matrix of them
+
+        Returns (scores, fractions, levels, crisis): condition scores, the
+        scores as fractions of each condition's maximum, severity levels as
+        indices into SEVERITY_LEVELS, and whether a critical question was
+        answered positively. Rows of a matrix are scored independently.
+        """
+        scores = encoded @ self.weights
+        fractions = np.divide(scores, self.max_scores, out=np.zeros_like(scores), where=self.max_scores > 0)
+        levels = (fractions[..., None] >= self.thresholds).sum(axis=-1)
+        crisis = (encoded[..., self.critical] > 0).any(axis=-1)
+        return scores, fractions, levels, crisis
+
+
+# One scorer (and weight matrix) for the configured question bank, shared by
+# the questionnaire handler and the symptom analyzer
+_scorer_instance = None
+_scorer_lock = threading.Lock()
+
+
+def get_scorer():
+    """Get or build the scorer for the configured question bank and weights"""
+    global _scorer_instance
+    if _scorer_instance is None:
+        with _scorer_lock:
+            if _scorer_instance is None:
+                _scorer_instance = QuestionnaireScorer.from_file(
+                    get_question_bank(), config.QUESTIONNAIRE_WEIGHTS_PATH
+                )
+    return _scorer_instance
+
+
+def _reset_scorer_lock_after_fork():
+    # The thread that held the lock at fork time does not exist in the child
+    global _scorer_lock
+    _scorer_lock = threading.Lock()
+
+
+os.register_at_fork(after_in_child=_reset_scorer_lock_after_fork)
@@ -0,0 +1,75 @@
+"""
+Result Cache - Bounded LRU cache for analysis results
+"""
+import threading
+from collections import OrderedDict
+
+MISSING = object()
+
+
+def normalize_text(text):
+    """Cache key form of a text: lowercased with whitespace collapsed"""
+    return ' '.join(text.lower().split())
+
+
+class ResultCache:
+    """Thread-safe LRU cache with hit, miss and eviction counters
+
+    max_entries bounds the entry count; max_text_chars (0 for no limit)
+    bounds the texts callers may cache results for, see admits().
+    """
+
+    def __init__(self, max_entries=4096, max_text_chars=0):
+        self.max_entries = max_entries
+        self.max_text_chars = max_text_chars
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._counters = {'hits': 0, 'misses': 0, 'evictions': 0, 'too_long': 0}
+
+    def admits(self, text):
+        """Whether results for text should be looked up and cached at all"""
+        if not self.max_text_chars or len(text) <= self.max_text_chars:
+            return True
+        with self._lock:
+            self._counters['too_long'] += 1
+        return False
+
+    def get(self, key):
+        """Return the cached value, or MISSING"""
+        with self._lock:
+            value = self._entries.get(key, MISSING)
+            if value is MISSING:
+                self._counters['misses'] += 1
+            else:
+                self._entries.move_to_end(key)
+                self._counters['hits'] += 1
+            return value
+
+    def put(self, key, value):
+        """Cache a value, evicting the least recently used entries past max_entries"""
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._counters['evictions'] += 1
+
+    def clear(self):
+        """Drop every entry, keeping the counters"""
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def stats(self):
+        """Counters for monitoring"""
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'max_text_chars': self.max_text_chars,
+                **self._counters
+            }
@@ -0,0 +1,82 @@
+"""
+Server Timing - Per-request stage durations for the Server-Timing header
+
+A view wrapped by the app starts a ServerTiming for the request; code on
+the request's path records stages into it with stage() or timed(). Outside
+a tracked request (other routes, streamed bodies, offline scoring) both
+are no-ops apart from one context variable lookup.
+"""
+import time
+from contextvars import ContextVar
+from functools import wraps
+
+_current = ContextVar('server_timing', default=None)
+
+
+class ServerTiming:
+    """Stage durations of one request, in first-recorded order"""
+
+    def __init__(self):
+        self.durations = {}
+
+    def add(self, name, seconds):
+        self.durations[name] = self.durations.get(name, 0.0) + seconds
+
+    def header(self, total=None):
+        """Server-Timing header value, durations in milliseconds"""
+        entries = [f'{name};dur={seconds * 1e3:.3f}' for name, seconds in self.durations.items()]
+        if total is not None:
+            entries.append(f'total;dur={total * 1e3:.3f}')
+        return ', '.join(entries)
+
+
+def begin():
+    """Start collecting stages for the current request, returning (timing, token)"""
+    timing = ServerTiming()
+    return timing, _current.set(timing)
+
+
+def end(token):
+    _current.reset(token)
+
+
+def add(name, seconds):
+    """Add to a stage of the current request, if one is tracked"""
+    timing = _current.get()
+    if timing is not None:
+        timing.add(name, seconds)
+
+
+class stage:
+    """Context manager adding the time spent in its block to a stage"""
+    __slots__ = ('name', 'timing', 'started')
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.timing = _current.get()
+        if self.timing is not None:
+            self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        if self.timing is not None:
+            self.timing.add(self.name, time.perf_counter() - self.started)
+
+
+def timed(name):
+    """Decorator adding each call's duration to a stage"""
+    def decorator(function):
+        @wraps(function)
+        def wrapper(*args, **kwargs):
+            timing = _current.get()
+            if timing is None:
+                return function(*args, **kwargs)
+            started = time.perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                timing.add(name, time.perf_counter() - started)
+        return wrapper
+    return decorator
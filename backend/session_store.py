@@ -0,0 +1,642 @@
+"""
+Session Store - Bounded storage for assessment sessions
+"""
+import json
+import os
+import sqlite3
+import sys
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+
+
+def approx_size(value):
+    """Rough in-memory footprint of a JSON-like value, in bytes"""
+    if isinstance(value, str):
+        return sys.getsizeof(value)
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(
+            approx_size(k) + approx_size(v) for k, v in value.items()
+        )
+    if isinstance(value, (list, tuple)):
+        return sys.getsizeof(value) + sum(approx_size(item) for item in value)
+    return sys.getsizeof(value)
+
+
+class _Entry:
+    """A stored session plus its bookkeeping"""
+    __slots__ = ('data', 'size', 'list_sizes', 'last_access')
+
+    def __init__(self, data, last_access):
+        self.data = data
+        self.size = 0
+        self.list_sizes = {}
+        self.last_access = last_access
+
+
+class SessionConflict(Exception):
+    """Raised by save() when another process saved the session since it was read"""
+
+
+class _StoredSession(dict):
+    """A session loaded from SQLite, remembering the version and list items it was stored with"""
+    __slots__ = ('version', 'stored_items')
+
+
+class SessionStore:
+    """Interface shared by the session backends
+
+    Sessions are JSON-serializable dicts. Routes that read and update a
+    session do so inside transaction(), which fetches it with get() and
+    hands it back with save(); list fields are treated as append-mostly so
+    backends can persist only the new items.
+    """
+
+    def __init__(self, ttl_seconds, sweep_interval, stripes=64):
+        self.ttl_seconds = ttl_seconds
+        self.sweep_interval = sweep_interval
+        self._stripes = [threading.Lock() for _ in range(stripes)]
+        self._sweeper = None
+        self._stop_sweeper = threading.Event()
+
+    def _stripe_index(self, session_id):
+        return hash(session_id) % len(self._stripes)
+
+    @contextmanager
+    def transaction(self, session_id, write=True):
+        """Yield the session (or None) while holding its stripe lock
+
+        Requests for the same session are serialized; sessions on other
+        stripes proceed in parallel. With write=True the session is saved
+        when the block exits normally; a store shared between processes may
+        then raise SessionConflict, and the caller should run the block again.
+        """
+        with self._stripes[self._stripe_index(session_id)]:
+            session = self.get(session_id)
+            yield session
+            if write and session is not None:
+                self.save(session_id, session)
+
+    def create(self, session_id, data):
+        """Store a new session, replacing any existing one with the same id"""
+        raise NotImplementedError
+
+    def get(self, session_id):
+        """Return the session dict, or None if it is unknown or expired"""
+        raise NotImplementedError
+
+    def save(self, session_id, data):
+        """Persist changes made to a session returned by get()"""
+        raise NotImplementedError
+
+    def delete(self, session_id):
+        """Delete a session, returning True if it existed"""
+        raise NotImplementedError
+
+    def sweep(self):
+        """Remove expired sessions, returning how many were removed"""
+        raise NotImplementedError
+
+    def stats(self):
+        """Counters for monitoring"""
+        raise NotImplementedError
+
+    def __contains__(self, session_id):
+        return self.get(session_id) is not None
+
+    def start_sweeper(self):
+        """Sweep expired sessions from a daemon thread every sweep interval"""
+        if self._sweeper is not None:
+            return
+        self._stop_sweeper.clear()
+        self._sweeper = threading.Thread(target=self._run_sweeper, name='session-sweeper', daemon=True)
+        self._sweeper.start()
+
+    def stop_sweeper(self):
+        """Stop the background sweeper thread"""
+        if self._sweeper is None:
+            return
+        self._stop_sweeper.set()
+        self._sweeper.join()
+        self._sweeper = None
+
+    def _run_sweeper(self):
+        while not self._stop_sweeper.wait(self.sweep_interval):
+            self.sweep()
+
+
+class MemorySessionStore(SessionStore):
+    """In-process session store with idle TTL, entry and byte limits
+
+    Sessions are spread over independently locked shards, each kept in
+    least-recently-used order, so concurrent requests for different sessions
+    rarely touch the same lock. Expired sessions are swept from the cold end
+    of each shard at most once per sweep interval, piggybacking on normal
+    store traffic, and optionally from a background thread. When a shard's
+    share of the entry count or of the approximate byte budget is exceeded,
+    its least recently used sessions are evicted.
+    """
+
+    def __init__(self, ttl_seconds=1800, max_entries=10000, max_bytes=256 * 1024 * 1024,
+                 sweep_interval=60, clock=time.monotonic, shards=16):
+        super().__init__(ttl_seconds, sweep_interval)
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._shards = [
+            _MemoryShard(ttl_seconds, -(-max_entries // shards), -(-max_bytes // shards),
+                         sweep_interval, clock)
+            for _ in range(shards)
+        ]
+
+    def _shard(self, session_id):
+        return self._shards[hash(session_id) % len(self._shards)]
+
+    def create(self, session_id, data):
+        """Store a new session, replacing any existing one with the same id"""
+        self._shard(session_id).create(session_id, data)
+
+    def get(self, session_id):
+        """Return the session dict, or None if it is unknown or expired"""
+        return self._shard(session_id).get(session_id)
+
+    def save(self, session_id, data):
+        """Record changes made to a session so its size is re-measured"""
+        self._shard(session_id).save(session_id, data)
+
+    def delete(self, session_id):
+        """Delete a session, returning True if it existed"""
+        return self._shard(session_id).delete(session_id)
+
+    def __len__(self):
+        return sum(len(shard) for shard in self._shards)
+
+    def sweep(self):
+        """Remove expired sessions, returning how many were removed"""
+        return sum(shard.sweep() for shard in self._shards)
+
+    def stats(self):
+        """Counters for monitoring, summed over all shards"""
+        totals = {}
+        for shard in self._shards:
+            for name, value in shard.stats().items():
+                totals[name] = totals.get(name, 0) + value
+        return totals
+
+
+class _MemoryShard:
+    """One LRU-ordered partition of a MemorySessionStore, with its own lock"""
+
+    def __init__(self, ttl_seconds, max_entries, max_bytes, sweep_interval, clock):
+        self.ttl_seconds = ttl_seconds
+        self.sweep_interval = sweep_interval
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._clock = clock
+
+        self._sessions = OrderedDict()
+        self._lock = threading.Lock()
+        self._total_bytes = 0
+        self._last_sweep = clock()
+
+        self._counters = {
+            'created': 0,
+            'deleted': 0,
+            'expired': 0,
+            'evicted': 0,
+            'hits': 0,
+            'misses': 0
+        }
+
+    def create(self, session_id, data):
+        with self._lock:
+            now = self._clock()
+            self._maybe_sweep(now)
+            self._remove(session_id)
+            entry = _Entry(data, now)
+            self._sessions[session_id] = entry
+            self._measure(entry)
+            self._counters['created'] += 1
+            self._enforce_limits()
+
+    def get(self, session_id):
+        with self._lock:
+            now = self._clock()
+            self._maybe_sweep(now)
+            entry = self._sessions.get(session_id)
+            if entry is None or self._is_expired(entry, now):
+                if entry is not None:
+                    self._remove(session_id)
+                    self._counters['expired'] += 1
+                self._counters['misses'] += 1
+                return None
+            entry.last_access = now
+            self._sessions.move_to_end(session_id)
+            self._counters['hits'] += 1
+            return entry.data
+
+    def save(self, session_id, data):
+        with self._lock:
+            entry = self._sessions.get(session_id)
+            if entry is None:
+                return
+            entry.data = data
+            entry.last_access = self._clock()
+            self._sessions.move_to_end(session_id)
+            self._measure(entry)
+            self._enforce_limits()
+
+    def delete(self, session_id):
+        with self._lock:
+            if self._remove(session_id):
+                self._counters['deleted'] += 1
+                return True
+            return False
+
+    def __len__(self):
+        return len(self._sessions)
+
+    def sweep(self):
+        with self._lock:
+            return self._sweep(self._clock())
+
+    def stats(self):
+        with self._lock:
+            return {
+                'live_sessions': len(self._sessions),
+                'approx_bytes': self._total_bytes,
+                **self._counters
+            }
+
+    def _is_expired(self, entry, now):
+        return now - entry.last_access > self.ttl_seconds
+
+    def _maybe_sweep(self, now):
+        if now - self._last_sweep >= self.sweep_interval:
+            self._sweep(now)
+
+    def _sweep(self, now):
+        self._last_sweep = now
+        removed = 0
+        # Entries are in access order, so expired ones sit at the front
+        while self._sessions:
+            session_id, entry = next(iter(self._sessions.items()))
+            if not self._is_expired(entry, now):
+                break
+            self._remove(session_id)
+            removed += 1
+        self._counters['expired'] += removed
+        return removed
+
+    def _remove(self, session_id):
+        entry = self._sessions.pop(session_id, None)
+        if entry is None:
+            return False
+        self._total_bytes -= entry.size
+        return True
+
+    def _enforce_limits(self):
+        # Never evict the most recently used session itself
+        while len(self._sessions) > 1 and (
+            len(self._sessions) > self.max_entries or self._total_bytes > self.max_bytes
+        ):
+            session_id = next(iter(self._sessions))
+            self._remove(session_id)
+            self._counters['evicted'] += 1
+
+    def _measure(self, entry):
+        """Update the entry's size, only measuring list items appended since last time"""
+        size = sys.getsizeof(entry.data)
+        list_sizes = {}
+        for key, value in entry.data.items():
+            size += approx_size(key)
+            if isinstance(value, list):
+                count, list_bytes = entry.list_sizes.get(key, (0, sys.getsizeof(value)))
+                if count > len(value):
+                    count, list_bytes = 0, sys.getsizeof(value)
+                list_bytes += sum(approx_size(item) for item in value[count:])
+                list_sizes[key] = (len(value), list_bytes)
+                size += list_bytes
+            else:
+                size += approx_size(value)
+        self._total_bytes += size - entry.size
+        entry.size = size
+        entry.list_sizes = list_sizes
+
+
+class SQLiteSessionStore(SessionStore):
+    """Session store shared by all worker processes through one SQLite file
+
+    The database runs in WAL mode so readers do not block the writer. The
+    scalar fields of a session are stored as one compact JSON document and
+    every list field (chat history, questionnaire responses) as one row per
+    item, so a turn only writes the header plus the items appended since the
+    previous save. Each thread, and each forked worker, opens its own
+    connection.
+
+    Sessions carry a version that every save increments. Reads take no
+    database lock; a save checks the version it read is still current and
+    raises SessionConflict if another process saved first, so the database
+    write lock is only held while the changes are written. Requests within
+    one process are still serialized by the stripe locks.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS sessions (
+            id TEXT PRIMARY KEY,
+            data TEXT NOT NULL,
+            item_counts TEXT NOT NULL,
+            last_access REAL NOT NULL,
+            version INTEGER NOT NULL DEFAULT 0
+        );
+        CREATE INDEX IF NOT EXISTS sessions_last_access ON sessions (last_access);
+        CREATE TABLE IF NOT EXISTS session_items (
+            session_id TEXT NOT NULL,
+            field TEXT NOT NULL,
+            seq INTEGER NOT NULL,
+            data TEXT NOT NULL,
+            PRIMARY KEY (session_id, field, seq)
+        ) WITHOUT ROWID;
+        CREATE TRIGGER IF NOT EXISTS sessions_delete_items AFTER DELETE ON sessions
+        BEGIN
+            DELETE FROM session_items WHERE session_id = old.id;
+        END;
+    """
+
+    def __init__(self, path, ttl_seconds=1800, max_entries=100000, sweep_interval=60,
+                 clock=time.time):
+        super().__init__(ttl_seconds, sweep_interval)
+        self.path = path
+        self.max_entries = max_entries
+        self._clock = clock
+        self._local = threading.local()
+        self._last_sweep = clock()
+
+        self._counter_lock = threading.Lock()
+        self._counters = {
+            'created': 0,
+            'deleted': 0,
+            'expired': 0,
+            'evicted': 0,
+            'hits': 0,
+            'misses': 0,
+            'conflicts': 0
+        }
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        conn = self._connection()
+        conn.executescript(self.SCHEMA)
+        with self._transaction(conn):
+            columns = [row[1] for row in conn.execute('PRAGMA table_info(sessions)')]
+            if 'version' not in columns:
+                # Databases created before sessions were versioned
+                conn.execute('ALTER TABLE sessions ADD COLUMN version INTEGER NOT NULL DEFAULT 0')
+
+    def create(self, session_id, data):
+        """Store a new session, replacing any existing one with the same id"""
+        header, lists = self._split(data)
+        now = self._clock()
+        conn = self._connection()
+        with self._transaction(conn):
+            # Keep counting versions up, so copies read before the replacement stay stale
+            row = conn.execute('SELECT version FROM sessions WHERE id = ?', (session_id,)).fetchone()
+            version = row[0] + 1 if row is not None else 0
+            conn.execute('DELETE FROM sessions WHERE id = ?', (session_id,))
+            conn.execute(
+                'INSERT INTO sessions (id, data, item_counts, last_access, version) VALUES (?, ?, ?, ?, ?)',
+                (session_id, header, _dumps({field: len(items) for field, items in lists.items()}), now,
+                 version)
+            )
+            for field, items in lists.items():
+                self._insert_items(conn, session_id, field, items, 0)
+        self._count('created')
+        self._maybe_sweep(now)
+
+    def get(self, session_id):
+        """Return the session dict, or None if it is unknown or expired
+
+        Only saves refresh the idle timer, so reading never writes to the
+        database (apart from deleting a session found expired).
+        """
+        if session_id is None:
+            self._count('misses')
+            return None
+        now = self._clock()
+        conn = self._connection()
+        data = None
+        # One snapshot, so a save from another process cannot land between the queries
+        with self._read_transaction(conn):
+            row = conn.execute(
+                'SELECT data, item_counts, last_access, version FROM sessions WHERE id = ?',
+                (session_id,)
+            ).fetchone()
+            if row is not None and now - row[2] <= self.ttl_seconds:
+                data = self._load(conn, session_id, row)
+        if data is None:
+            if row is not None:
+                # Unless another process saved it since
+                conn.execute(
+                    'DELETE FROM sessions WHERE id = ? AND version = ?', (session_id, row[3])
+                )
+                self._count('expired')
+            self._count('misses')
+            return None
+        self._count('hits')
+        self._maybe_sweep(now)
+        return data
+
+    def save(self, session_id, data):
+        """Persist the header and any list items appended since the last save
+        
+        A list that was replaced, shortened or had items swapped out since
+        get() is rewritten in full. Items changed in place inside a stored
+        dict are not detected; lists are append-mostly.
+
+        Raises SessionConflict if the session was read with get() and
+        another process has saved it since.
+        """
+        header, lists = self._split(data)
+        stored_items = getattr(data, 'stored_items', None)
+        read_version = getattr(data, 'version', None)
+        conn = self._connection()
+        with self._transaction(conn):
+            row = conn.execute(
+                'SELECT item_counts, version FROM sessions WHERE id = ?', (session_id,)
+            ).fetchone()
+            if row is None:
+                return
+            # Checked under the write lock, so no other save can land in between
+            if read_version is not None and row[1] != read_version:
+                self._count('conflicts')
+                raise SessionConflict(session_id)
+            stored_counts = json.loads(row[0])
+
+            for field in stored_counts.keys() - lists.keys():
+                conn.execute(
+                    'DELETE FROM session_items WHERE session_id = ? AND field = ?',
+                    (session_id, field)
+                )
+            for field, items in lists.items():
+                stored = stored_counts.get(field, 0)
+                previous = stored_items.get(field) if stored_items is not None else None
+                if stored and not self._only_appended(items, previous, stored):
+                    conn.execute(
+                        'DELETE FROM session_items WHERE session_id = ? AND field = ?',
+                        (session_id, field)
+                    )
+                    stored = 0
+                self._insert_items(conn, session_id, field, items[stored:], stored)
+
+            conn.execute(
+                'UPDATE sessions SET data = ?, item_counts = ?, last_access = ?, version = ? '
+                'WHERE id = ?',
+                (header, _dumps({field: len(items) for field, items in lists.items()}),
+                 self._clock(), row[1] + 1, session_id)
+            )
+        if isinstance(data, _StoredSession):
+            data.version = row[1] + 1
+            data.stored_items = {field: list(items) for field, items in lists.items()}
+
+    def delete(self, session_id):
+        """Delete a session, returning True if it existed"""
+        cursor = self._connection().execute('DELETE FROM sessions WHERE id = ?', (session_id,))
+        if cursor.rowcount:
+            self._count('deleted')
+            return True
+        return False
+
+    def sweep(self):
+        """Remove expired sessions and trim to max_entries, returning how many were removed"""
+        now = self._clock()
+        self._last_sweep = now
+        conn = self._connection()
+        with self._transaction(conn):
+            expired = conn.execute(
+                'DELETE FROM sessions WHERE last_access < ?', (now - self.ttl_seconds,)
+            ).rowcount
+            evicted = conn.execute(
+                'DELETE FROM sessions WHERE id IN '
+                '(SELECT id FROM sessions ORDER BY last_access DESC LIMIT -1 OFFSET ?)',
+                (self.max_entries,)
+            ).rowcount
+        self._count('expired', expired)
+        self._count('evicted', evicted)
+        return expired + evicted
+
+    def stats(self):
+        """Counters for monitoring; live_sessions and approx_bytes cover all workers"""
+        conn = self._connection()
+        live = conn.execute('SELECT COUNT(*) FROM sessions').fetchone()[0]
+        page_count = conn.execute('PRAGMA page_count').fetchone()[0]
+        page_size = conn.execute('PRAGMA page_size').fetchone()[0]
+        with self._counter_lock:
+            return {
+                'live_sessions': live,
+                'approx_bytes': page_count * page_size,
+                **self._counters
+            }
+
+    def close(self):
+        """Close this thread's connection"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+    def _connection(self):
+        conn = getattr(self._local, 'conn', None)
+        # A connection must not cross a fork, so key it on the process id too
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None,
+                                   check_same_thread=False)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    @staticmethod
+    @contextmanager
+    def _transaction(conn):
+        """Run the block in a write transaction, joining one already open"""
+        if conn.in_transaction:
+            yield
+            return
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            yield
+        except BaseException:
+            conn.execute('ROLLBACK')
+            raise
+        conn.execute('COMMIT')
+
+    @staticmethod
+    @contextmanager
+    def _read_transaction(conn):
+        """Run the block's reads against one snapshot, joining a transaction already open"""
+        if conn.in_transaction:
+            yield
+            return
+        conn.execute('BEGIN')
+        try:
+            yield
+        finally:
+            conn.execute('COMMIT')
+
+    @staticmethod
+    def _load(conn, session_id, row):
+        """Build the session from its header row and its list items"""
+        data = _StoredSession(json.loads(row[0]))
+        fields = json.loads(row[1])
+        for field in fields:
+            data[field] = []
+        for field, item in conn.execute(
+            'SELECT field, data FROM session_items WHERE session_id = ? ORDER BY field, seq',
+            (session_id,)
+        ):
+            data[field].append(json.loads(item))
+        data.version = row[3]
+        data.stored_items = {field: list(data[field]) for field in fields}
+        return data
+
+    @staticmethod
+    def _split(data):
+        """Separate a session into its compact JSON header and its list fields"""
+        header = {}
+        lists = {}
+        for key, value in data.items():
+            if isinstance(value, list):
+                lists[key] = value
+            else:
+                header[key] = value
+        return _dumps(header), lists
+
+    @staticmethod
+    def _only_appended(items, previous, stored):
+        """True if items is the stored list of length stored plus new items at the end"""
+        return (
+            previous is not None and len(previous) == stored and len(items) >= stored
+            and all(item is old for item, old in zip(items, previous))
+        )
+
+    @staticmethod
+    def _insert_items(conn, session_id, field, items, start):
+        if items:
+            conn.executemany(
+                'INSERT INTO session_items (session_id, field, seq, data) VALUES (?, ?, ?, ?)',
+                ((session_id, field, seq, _dumps(item)) for seq, item in enumerate(items, start))
+            )
+
+    def _maybe_sweep(self, now):
+        if now - self._last_sweep >= self.sweep_interval:
+            self.sweep()
+
+    def _count(self, name, amount=1):
+        with self._counter_lock:
+            self._counters[name] += amount
+
+
+def _dumps(value):
+    """Compact JSON encoding used for stored session data"""
+    return json.dumps(value, separators=(',', ':'), ensure_ascii=False)
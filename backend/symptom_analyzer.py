@@ -1,10 +1,9 @@
-import pandas as pd
-import numpy as np
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
-import re
-import json
+from datetime import datetime
+import config
+from metrics import timed
 from ml_model import get_model
+from result_cache import MISSING, ResultCache, normalize_text
+import server_timing
 
 
 class SymptomAnalyzer:
@@ -13,11 +12,12 @@ class SymptomAnalyzer:
     def __init__(self):
         self.conditions = self._load_conditions()
         self.symptom_keywords = self._build_symptom_keywords()
-        self.vectorizer = TfidfVectorizer(ngram_range=(1, 2), max_features=1000)
-        self._train_vectorizer()
-        
-        # Initialize ML model
-        self.ml_model = get_model()
+        self.symptom_cache = ResultCache(config.SYMPTOM_CACHE_SIZE, config.PREDICTION_CACHE_MAX_CHARS)
+    
+    @property
+    def ml_model(self):
+        """The shared ML model, loaded on first use"""
+        return get_model()
     
     def _load_conditions(self):
         """Load mental health conditions database"""
@@ -211,18 +211,20 @@ class SymptomAnalyzer:
         }
         return keywords
     
-    def _train_vectorizer(self):
-        """Train TF-IDF vectorizer on symptoms"""
-        all_symptoms = []
-        for condition in self.conditions.values():
-            all_symptoms.extend(condition['symptoms'])
-        
-        if all_symptoms:
-            self.vectorizer.fit(all_symptoms)
-    
+    @server_timing.timed('detect')
     def extract_symptoms(self, text):
-        """Extract symptoms from user text"""
-        text_lower = text.lower()
+        """Extract symptoms from user text, caching results on the normalized text"""
+        text = normalize_text(text)
+        if not self.symptom_cache.admits(text):
+            return self._extract_symptoms(text)
+        found_symptoms = self.symptom_cache.get(text)
+        if found_symptoms is MISSING:
+            found_symptoms = self._extract_symptoms(text)
+            self.symptom_cache.put(text, found_symptoms)
+        return list(found_symptoms)
+    
+    def _extract_symptoms(self, text_lower):
+        """Match the symptom keywords against normalized text"""
         found_symptoms = []
         
         # Check for keyword matches
@@ -232,6 +234,7 @@ class SymptomAnalyzer:
         
         return found_symptoms
     
+    @server_timing.timed('merge')
     def get_possible_conditions(self, symptoms):
         """Get possible conditions based on symptoms"""
         condition_scores = {}
@@ -259,30 +262,78 @@ class SymptomAnalyzer:
     
     def analyze_questionnaire(self, responses):
         """Analyze questionnaire responses"""
-        # Count positive responses per condition
-        condition_matches = {}
+        return self.analyze_questionnaire_batch([responses])[0]
+    
+    def analyze_questionnaire_batch(self, response_sets):
+        """Analyze many completed questionnaires with one matrix product"""
+        import numpy as np
+        from questionnaire_scoring import answers_from_responses
         
-        for response in responses:
-            answer = response.get('answer', '')
-            if answer.lower() in ['yes', 'often', 'always', 'true']:
-                # Increment condition scores based on question
-                # This would be more sophisticated with actual questionnaire mapping
-                pass
+        scorer = self.questionnaire_scorer
+        answer_sets = [answers_from_responses(responses) for responses in response_sets]
+        scores, fractions, levels, crisis = scorer.score(scorer.encode_batch(answer_sets))
+        orders = np.argsort(-fractions, axis=1, kind='stable')
         
-        # Calculate results
-        results = self._calculate_results(condition_matches)
-        return results
+        assessment_date = datetime.now().isoformat()
+        batch_results = []
+        for row, order in enumerate(orders):
+            results = self._calculate_results(
+                [scorer.conditions[i] for i in order],
+                scores[row, order],
+                fractions[row, order],
+                levels[row, order]
+            )
+            batch_results.append({
+                'assessment_date': assessment_date,
+                'questions_answered': len(answer_sets[row]),
+                'conditions_identified': results,
+                'recommendations': self._generate_recommendations(results),
+                'crisis': bool(crisis[row])
+            })
+        return batch_results
     
-    def analyze_chat_symptoms(self, symptoms, chat_history):
-        """Analyze symptoms collected from chat using ML model"""
-        # Extract all user messages for ML analysis
-        user_messages = [msg['message'] for msg in chat_history if msg['role'] == 'user']
-        combined_text = ' '.join(user_messages)
+    @property
+    def questionnaire_scorer(self):
+        """Scorer for the configured question bank, shared with the questionnaire handler"""
+        from questionnaire_scoring import get_scorer
+        return get_scorer()
+    
+    def update_chat_terms(self, term_state, message, chat_history):
+        """Fold a new user message into a session's running term state
         
-        # Use ML model for prediction
-        ml_predictions = self.ml_model.predict_conditions(combined_text, top_k=5)
+        chat_history must already include the message. A missing state, or
+        one built by another model version, is rebuilt from the history.
+        """
+        model = self.ml_model
+        if model.is_current(term_state):
+            model.add_to_term_state(term_state, message)
+            return term_state
         
-        # Also use keyword-based analysis for additional coverage
+        term_state = model.new_term_state()
+        for msg in chat_history:
+            if msg['role'] == 'user':
+                model.add_to_term_state(term_state, msg['message'])
+        return term_state
+    
+    @timed('analyze_chat_symptoms')
+    def analyze_chat_symptoms(self, symptoms, chat_history, term_state=None):
+        """Analyze symptoms collected from chat using ML model"""
+        results = {'assessment_date': datetime.now().isoformat()}
+        for stage, payload in self.iter_chat_analysis(symptoms, chat_history, term_state):
+            if stage == 'keywords':
+                results['total_symptoms_detected'] = payload['total_symptoms_detected']
+            else:
+                results.update(payload)
+        results['ml_powered'] = True
+        return results
+    
+    def iter_chat_analysis(self, symptoms, chat_history, term_state=None):
+        """Analyze chat symptoms in stages, yielding (stage, payload) as each is ready
+        
+        'keywords' comes first and only needs the keyword table, then the
+        merged ML 'predictions', then the 'recommendations' built from them.
+        """
+        # Keyword-based analysis for additional coverage
         condition_scores = {}
         for symptom in symptoms:
             if symptom in self.symptom_keywords:
@@ -295,16 +346,41 @@ class SymptomAnalyzer:
                     condition_scores[condition]['count'] += 1
                     condition_scores[condition]['symptoms'].append(symptom)
         
-        # Build combined results from ML model
+        keyword_results = self._keyword_results(condition_scores)
+        yield 'keywords', {
+            'total_symptoms_detected': len(set(symptoms)),
+            'keyword_conditions': sorted(keyword_results, key=lambda x: x['confidence'], reverse=True)
+        }
+        
+        model = self.ml_model
+        if model.is_current(term_state):
+            # Score the running term state instead of re-reading the transcript
+            ml_predictions = model.predict_from_term_state(term_state, top_k=5)
+        else:
+            # Extract all user messages for ML analysis
+            user_messages = [msg['message'] for msg in chat_history if msg['role'] == 'user']
+            combined_text = ' '.join(user_messages)
+            
+            # Use ML model for prediction
+            ml_predictions = model.predict_conditions(combined_text, top_k=5)
+        
+        results = self._merge_results(ml_predictions, keyword_results)
+        yield 'predictions', {'conditions_identified': results[:5]}  # Top 5 conditions
+        yield 'recommendations', {'recommendations': self._generate_recommendations(results)}
+    
+    @server_timing.timed('merge')
+    def _merge_results(self, ml_predictions, keyword_results):
+        """Combine ML predictions with keyword results, by confidence"""
+        model = self.ml_model
+        
+        # Build combined results, ML model predictions first
         results = []
         seen_conditions = set()
-        
-        # First add ML model predictions
         for pred in ml_predictions:
             seen_conditions.add(pred['condition'])
             
             # Get description from conditions dict or ML model
-            description = self.ml_model._get_condition_description(pred['condition'])
+            description = model._get_condition_description(pred['condition'])
             
             results.append({
                 'condition': pred['condition'],
@@ -316,8 +392,18 @@ class SymptomAnalyzer:
             })
         
         # Add keyword-based results not in ML predictions
+        results.extend(result for result in keyword_results if result['condition'] not in seen_conditions)
+        
+        # Sort by confidence
+        results.sort(key=lambda x: x['confidence'], reverse=True)
+        return results
+    
+    @server_timing.timed('merge')
+    def _keyword_results(self, condition_scores):
+        """Build result dicts for the known conditions found by keyword matching"""
+        results = []
         for condition_name, data in condition_scores.items():
-            if condition_name not in seen_conditions and condition_name in self.conditions:
+            if condition_name in self.conditions:
                 condition_info = self.conditions[condition_name]
                 symptom_count = data['count']
                 
@@ -337,17 +423,7 @@ class SymptomAnalyzer:
                     'matched_symptoms': data['symptoms'],
                     'symptom_count': symptom_count
                 })
-        
-        # Sort by confidence
-        results.sort(key=lambda x: x['confidence'], reverse=True)
-        
-        return {
-            'assessment_date': pd.Timestamp.now().isoformat(),
-            'total_symptoms_detected': len(set(symptoms)),
-            'conditions_identified': results[:5],  # Top 5 conditions
-            'recommendations': self._generate_recommendations(results),
-            'ml_powered': True
-        }
+        return results
     
     def _determine_severity(self, symptom_count, thresholds):
         """Determine severity level"""
@@ -360,6 +436,7 @@ class SymptomAnalyzer:
         else:
             return 'Minimal'
     
+    @server_timing.timed('merge')
     def _generate_recommendations(self, results):
         """Generate recommendations based on results"""
         recommendations = []
@@ -408,25 +485,23 @@ class SymptomAnalyzer:
         
         return recommendations
     
-    def _calculate_results(self, condition_matches):
-        """Calculate assessment results"""
+    def _calculate_results(self, conditions, scores, fractions, levels):
+        """Calculate assessment results for ranked questionnaire condition scores"""
+        from questionnaire_scoring import SEVERITY_LEVELS
+        
         results = []
         
-        for condition_name, score in condition_matches.items():
-            if condition_name in self.conditions:
-                condition_info = self.conditions[condition_name]
-                
-                severity = self._determine_severity(
-                    score,
-                    condition_info['severity_thresholds']
-                )
-                
-                results.append({
-                    'condition': condition_name,
-                    'description': condition_info['description'],
-                    'score': score,
-                    'severity': severity
-                })
+        for condition_name, score, fraction, level in zip(conditions, scores, fractions, levels):
+            if score <= 0:
+                continue
+            condition_info = self.conditions.get(condition_name, {})
+            results.append({
+                'condition': condition_name,
+                'description': condition_info.get('description', 'A mental health condition.'),
+                'score': round(float(score), 2),
+                'confidence': round(float(fraction) * 100, 2),
+                'severity': SEVERITY_LEVELS[level]
+            })
         
         return results
     
@@ -0,0 +1,46 @@
+"""
+Synonym Expansion - Appends thesaurus expansions for terms found in text
+"""
+import functools
+import hashlib
+import json
+from phrase_matcher import PhraseMatcher
+
+
+class SynonymExpander:
+    """Expands text with synonyms from a thesaurus, matched on word boundaries
+
+    The thesaurus is a list of entries, each with the 'terms' that trigger it
+    and the 'expansion' text appended once when any of them occurs. All terms
+    are compiled into one PhraseMatcher, so the cost of an expansion depends
+    on the length of the text rather than the size of the thesaurus, and
+    results are cached per distinct input of at most max_text_chars
+    characters (0 for no limit).
+    """
+
+    def __init__(self, entries, cache_size=4096, max_text_chars=0):
+        self.expansions = [entry['expansion'] for entry in entries]
+        # Identifies the thesaurus, so state holding entry indices can be checked against it
+        self.key = hashlib.sha256(json.dumps(entries, sort_keys=True).encode('utf-8')).hexdigest()[:16]
+        self.matcher = PhraseMatcher({i: entry['terms'] for i, entry in enumerate(entries)})
+        self.max_text_chars = max_text_chars
+        self._cached_expand = functools.lru_cache(maxsize=cache_size)(self._expand)
+
+    @classmethod
+    def from_file(cls, path, cache_size=4096, max_text_chars=0):
+        """Load a thesaurus from a JSON file"""
+        with open(path, encoding='utf-8') as f:
+            return cls(json.load(f), cache_size, max_text_chars)
+
+    def expand(self, text):
+        """Return text with its expansions appended, cached unless text is too long"""
+        if self.max_text_chars and len(text) > self.max_text_chars:
+            return self._expand(text)
+        return self._cached_expand(text)
+
+    def _expand(self, text):
+        """Return text followed by the expansion of every entry it triggers, in thesaurus order"""
+        matched = self.matcher.labels_in(text)
+        if not matched:
+            return text
+        return text + ''.join(' ' + self.expansions[i] for i in matched)
@@ -0,0 +1,31 @@
+"""
+Regression tests for bulk_score: malformed records are reported, not fatal
+
+Run from the backend directory:
+    python -m pytest test_bulk_score.py
+"""
+import bulk_score
+from chat_handler import ChatHandler
+from symptom_analyzer import SymptomAnalyzer
+
+
+def setup_module():
+    # What _init_worker sets up, without redirecting stdout
+    bulk_score._worker['chat_handler'] = ChatHandler()
+    bulk_score._worker['symptom_analyzer'] = SymptomAnalyzer()
+
+
+def test_bad_records_do_not_fail_the_chunk():
+    outputs = bulk_score.score_chunk([
+        (1, {'id': 'no-index', 'responses': [{'answer': 'Yes'}]}),
+        (2, {'id': 'null-message', 'messages': [{'role': 'user', 'message': None}]}),
+        (3, {'id': 'bad-index', 'answers': {'first': 'Yes'}}),
+        (4, {'id': 'questionnaire', 'responses': [{'question_index': '0', 'answer': 'Often'}]}),
+        (5, {'id': 'chat', 'text': 'I feel sad and hopeless'})
+    ])
+
+    assert [output['line'] for output in outputs] == [1, 2, 3, 4, 5]
+    assert all('error' in output for output in outputs[:3])
+    assert outputs[3]['type'] == 'questionnaire'
+    assert outputs[3]['results']['questions_answered'] == 1
+    assert outputs[4]['type'] == 'chat'
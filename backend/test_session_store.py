@@ -0,0 +1,188 @@
+"""
+Tests for session_store: TTL, LRU and byte eviction, and the SQLite round trip
+
+Run from the backend directory:
+    python -m pytest test_session_store.py
+"""
+import pytest
+
+from session_store import MemorySessionStore, SessionConflict, SQLiteSessionStore
+
+
+class FakeClock:
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+def make_session(**fields):
+    return dict({'type': 'chat', 'chat_history': [], 'symptoms_detected': []}, **fields)
+
+
+def test_memory_sessions_expire_after_idle_ttl():
+    clock = FakeClock()
+    store = MemorySessionStore(ttl_seconds=10, sweep_interval=1000, clock=clock)
+    store.create('a', make_session())
+    store.create('b', make_session())
+
+    clock.now += 8
+    assert store.get('a') is not None  # refreshes a's idle timer
+    clock.now += 8
+    assert store.get('a') is not None
+    assert store.get('b') is None
+    assert store.stats()['expired'] == 1
+
+
+def test_memory_sweep_removes_only_expired_sessions():
+    clock = FakeClock()
+    store = MemorySessionStore(ttl_seconds=10, sweep_interval=1000, clock=clock, shards=1)
+    store.create('old', make_session())
+    clock.now += 6
+    store.create('new', make_session())
+    clock.now += 6
+
+    assert store.sweep() == 1
+    assert len(store) == 1
+    assert 'new' in store
+
+
+def test_memory_evicts_least_recently_used_over_max_entries():
+    store = MemorySessionStore(max_entries=2, clock=FakeClock(), shards=1)
+    store.create('a', make_session())
+    store.create('b', make_session())
+    store.get('a')
+    store.create('c', make_session())
+
+    assert 'a' in store and 'c' in store
+    assert 'b' not in store
+    assert store.stats()['evicted'] == 1
+
+
+def test_memory_evicts_over_max_bytes_when_sessions_grow():
+    store = MemorySessionStore(max_bytes=20000, clock=FakeClock(), shards=1)
+    store.create('a', make_session())
+    store.create('b', make_session())
+
+    with store.transaction('b') as session:
+        session['chat_history'].extend({'role': 'user', 'message': 'x' * 100} for _ in range(50))
+
+    assert 'a' not in store
+    assert 'b' in store  # the most recently used session is never evicted
+    assert store.stats()['approx_bytes'] > 20000
+
+
+def test_memory_byte_count_follows_shrinking_lists():
+    store = MemorySessionStore(clock=FakeClock(), shards=1)
+    store.create('a', make_session(chat_history=['x' * 1000] * 10))
+    before = store.stats()['approx_bytes']
+
+    with store.transaction('a') as session:
+        session['chat_history'] = session['chat_history'][:1]
+
+    assert store.stats()['approx_bytes'] < before
+    store.delete('a')
+    assert store.stats()['approx_bytes'] == 0
+
+
+def sqlite_store(tmp_path, **kwargs):
+    return SQLiteSessionStore(str(tmp_path / 'sessions.db'), **kwargs)
+
+
+def test_sqlite_round_trip(tmp_path):
+    store = sqlite_store(tmp_path)
+    data = make_session(started_at='2024-01-01T00:00:00', chat_terms={'counts': {'sad': 2}},
+                        chat_history=[{'role': 'user', 'message': 'hello'}])
+    store.create('s', data)
+
+    with store.transaction('s') as session:
+        session['chat_history'].append({'role': 'bot', 'message': 'hi'})
+        session['symptoms_detected'].append('low mood')
+        session['chat_terms']['counts']['sad'] = 3
+
+    expected = make_session(started_at='2024-01-01T00:00:00', chat_terms={'counts': {'sad': 3}},
+                            chat_history=[{'role': 'user', 'message': 'hello'},
+                                          {'role': 'bot', 'message': 'hi'}],
+                            symptoms_detected=['low mood'])
+    assert store.get('s') == expected
+    # A fresh connection sees the same session
+    assert sqlite_store(tmp_path).get('s') == expected
+
+
+def test_sqlite_save_rewrites_replaced_and_shortened_lists(tmp_path):
+    store = sqlite_store(tmp_path)
+    store.create('s', {'h': [1, 2], 'r': ['a', 'b', 'c'], 'gone': [1]})
+
+    session = store.get('s')
+    session['h'] = [7]
+    session['r'][1] = 'B'
+    del session['gone']
+    store.save('s', session)
+    assert store.get('s') == {'h': [7], 'r': ['a', 'B', 'c']}
+
+    # Saving twice after one get() keeps appending from the saved state
+    session['h'].append(8)
+    store.save('s', session)
+    session['h'].append(9)
+    store.save('s', session)
+    assert store.get('s') == {'h': [7, 8, 9], 'r': ['a', 'B', 'c']}
+
+
+def test_sqlite_save_of_a_plain_dict_replaces_lists(tmp_path):
+    store = sqlite_store(tmp_path)
+    store.create('s', {'h': [1, 2, 3]})
+
+    store.save('s', {'h': [4, 5, 6, 7]})
+
+    assert store.get('s') == {'h': [4, 5, 6, 7]}
+
+
+def test_sqlite_sessions_expire_and_are_trimmed(tmp_path):
+    clock = FakeClock()
+    store = sqlite_store(tmp_path, ttl_seconds=10, max_entries=2, sweep_interval=1000, clock=clock)
+    store.create('old', make_session())
+    clock.now += 8
+    for session_id in ('a', 'b', 'c'):
+        store.create(session_id, make_session())
+        clock.now += 1
+
+    assert store.get('old') is None
+    assert store.sweep() == 1
+    assert store.get('a') is None
+    assert store.get('b') is not None and store.get('c') is not None
+    stats = store.stats()
+    assert stats['live_sessions'] == 2
+    assert stats['expired'] == 1 and stats['evicted'] == 1
+
+
+def test_sqlite_save_rejects_a_session_saved_by_another_process(tmp_path):
+    # Two stores on one file stand in for two worker processes
+    first, second = sqlite_store(tmp_path), sqlite_store(tmp_path)
+    first.create('s', {'h': [1]})
+    mine, theirs = first.get('s'), second.get('s')
+
+    theirs['h'].append(2)
+    second.save('s', theirs)
+    mine['h'].append(3)
+    with pytest.raises(SessionConflict):
+        first.save('s', mine)
+
+    # Running the update again on a fresh read succeeds
+    with first.transaction('s') as session:
+        session['h'].append(3)
+    assert second.get('s') == {'h': [1, 2, 3]}
+    assert first.stats()['conflicts'] == 1
+
+
+def test_sqlite_reads_do_not_write(tmp_path):
+    clock = FakeClock()
+    store = sqlite_store(tmp_path, ttl_seconds=10, clock=clock)
+    store.create('s', {'h': [1]})
+
+    clock.now += 6
+    with store.transaction('s', write=False) as session:
+        assert session == {'h': [1]}
+    clock.now += 6
+    # Reading did not refresh the idle timer
+    assert store.get('s') is None
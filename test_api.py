@@ -108,7 +108,19 @@ def test_chat_flow():
     data = response.json()
     print(f"\nAnalysis Results:")
     print(json.dumps(data['results'], indent=2))
-    
+
+    # Get the same analysis streamed stage by stage
+    print("\n4. Streaming analysis...")
+    response = requests.post(
+        f"{BASE_URL}/api/chat/analyze",
+        json={"session_id": session_id},
+        headers={"Accept": "application/x-ndjson"},
+        stream=True
+    )
+    for line in response.iter_lines():
+        if line:
+            print(f"Event: {json.loads(line)['event']}")
+
     return session_id
 
 def test_symptom_search():
@@ -132,6 +144,30 @@ def test_symptom_search():
         data = response.json()
         print(f"Symptoms Found: {data['symptoms_found']}")
         print(f"Possible Conditions: {data['possible_conditions']}")
+        print(f"Server-Timing: {response.headers.get('Server-Timing')}")
+
+def test_symptom_search_batch():
+    """Test batch symptom search endpoint"""
+    print("\n" + "="*50)
+    print("Testing Batch Symptom Search...")
+    print("="*50)
+    
+    test_texts = [
+        "I feel anxious and can't stop worrying about everything",
+        "I have been experiencing panic attacks with heart palpitations",
+        "I'm having intrusive thoughts and checking things repeatedly"
+    ]
+    
+    response = requests.post(
+        f"{BASE_URL}/api/symptoms/search/batch",
+        json={"texts": test_texts}
+    )
+    data = response.json()
+    
+    for text, result in zip(test_texts, data['results']):
+        print(f"\nText: '{text}'")
+        print(f"Symptoms Found: {result['symptoms_found']}")
+        print(f"ML Predictions: {[p['condition'] for p in result['ml_predictions']]}")
 
 def test_conditions_endpoints():
     """Test conditions endpoints"""
@@ -175,6 +211,7 @@ def run_all_tests():
         # Run tests
         test_conditions_endpoints()
         test_symptom_search()
+        test_symptom_search_batch()
         test_questionnaire_flow()
         test_chat_flow()
         